@@ -1,85 +1,143 @@
 import os
+import queue
+import atexit
 import logging
-from flask import Flask, jsonify
-from routes.ai_endpoints import ai_bp
-from config import SECRET_KEY, DEBUG
+import logging.handlers
+import orjson
+from flask import Flask, Response
+from flask.json.provider import JSONProvider
+from flask_compress import Compress
+from middleware.auth import authenticate_request
+from utils.helpers import orjson_default
+from config import SECRET_KEY, DEBUG, COMPRESS_RESPONSES
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG if DEBUG else logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configure logging: request threads only enqueue records, a background listener writes them
+_log_queue = queue.Queue(-1)
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+_root_logger = logging.getLogger()
+_root_logger.setLevel(logging.DEBUG if DEBUG else logging.INFO)
+_root_logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_listener = logging.handlers.QueueListener(_log_queue, _stream_handler, respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 
 logger = logging.getLogger(__name__)
 
+# Static response bodies are serialized once at import instead of on every hit
+_ROOT_BODY = orjson.dumps({
+    "service": "AI Agent API Server",
+    "description": "Python Flask REST API demonstrating OpenAI capabilities with Azure Blob Storage",
+    "version": "1.0.0",
+    "endpoints": {
+        "health": "/health",
+        "summarize": "/summarize",
+        "summarize_stream": "/summarize/stream",
+        "sentiment": "/sentiment",
+        "extract_keywords": "/extract-keywords",
+        "translate": "/translate",
+        "translate_stream": "/translate/stream",
+        "structure_data": "/structure-data",
+        "detect_topics": "/detect-topics",
+        "analyze": "/analyze",
+        "summarize_batch": "/summarize-batch",
+        "batch": "/batch"
+    },
+    "authentication": "Each endpoint requires X-API-Key header with endpoint-specific API key",
+    "documentation": {
+        "file_path_format": "container/filename.ext or full blob URL",
+        "supported_formats": ["PDF", "TXT", "MD", "CSV", "JSON", "XML"],
+        "required_headers": ["X-API-Key", "Content-Type: application/json"]
+    }
+})
+
+_NOT_FOUND_BODY = orjson.dumps({
+    "status": "error",
+    "error": "not_found",
+    "message": "The requested endpoint was not found"
+})
+
+_METHOD_NOT_ALLOWED_BODY = orjson.dumps({
+    "status": "error",
+    "error": "method_not_allowed",
+    "message": "The request method is not allowed for this endpoint"
+})
+
+_PAYLOAD_TOO_LARGE_BODY = orjson.dumps({
+    "status": "error",
+    "error": "payload_too_large",
+    "message": "The request body exceeds the maximum allowed size"
+})
+
+_INTERNAL_ERROR_BODY = orjson.dumps({
+    "status": "error",
+    "error": "internal_server_error",
+    "message": "An internal server error occurred"
+})
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider that routes jsonify and request parsing through orjson"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=orjson_default, option=orjson.OPT_NON_STR_KEYS).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 def create_app():
     """Create and configure Flask application"""
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
     
     # Configure app
     app.secret_key = SECRET_KEY
     app.config['DEBUG'] = DEBUG
+    # Reject oversized request bodies before any handler runs (requests only carry a file path)
+    app.config['MAX_CONTENT_LENGTH'] = 2 * 1024 * 1024
+    
+    # Compress large JSON bodies (translations, structured data); disable with
+    # COMPRESS_RESPONSES=false when a proxy in front already compresses
+    if COMPRESS_RESPONSES:
+        app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+        app.config['COMPRESS_MIMETYPES'] = ['application/json']
+        app.config['COMPRESS_MIN_SIZE'] = 1024
+        app.config['COMPRESS_BR_LEVEL'] = 4
+        Compress(app)
     
-    # Register blueprints
+    # Register blueprints (imported here so the Azure/OpenAI SDKs load with the app, not the module)
+    from routes.ai_endpoints import ai_bp, fast_health_check
     app.register_blueprint(ai_bp)
     
+    # Health probes are answered first, then endpoint API keys are checked once per
+    # request before any view decorators run
+    app.before_request(fast_health_check)
+    app.before_request(authenticate_request)
+    
     # Root endpoint
     @app.route('/', methods=['GET'])
     def root():
-        return jsonify({
-            "service": "AI Agent API Server",
-            "description": "Python Flask REST API demonstrating OpenAI capabilities with Azure Blob Storage",
-            "version": "1.0.0",
-            "endpoints": {
-                "health": "/health",
-                "summarize": "/summarize",
-                "sentiment": "/sentiment",
-                "extract_keywords": "/extract-keywords",
-                "translate": "/translate",
-                "structure_data": "/structure-data",
-                "detect_topics": "/detect-topics"
-            },
-            "authentication": "Each endpoint requires X-API-Key header with endpoint-specific API key",
-            "documentation": {
-                "file_path_format": "container/filename.ext or full blob URL",
-                "supported_formats": ["PDF", "TXT", "MD", "CSV", "JSON", "XML"],
-                "required_headers": ["X-API-Key", "Content-Type: application/json"]
-            }
-        })
+        return Response(_ROOT_BODY, mimetype='application/json')
     
     # Error handlers
     @app.errorhandler(404)
     def not_found(error):
-        return jsonify({
-            "status": "error",
-            "error": "not_found",
-            "message": "The requested endpoint was not found"
-        }), 404
+        return Response(_NOT_FOUND_BODY, status=404, mimetype='application/json')
     
     @app.errorhandler(405)
     def method_not_allowed(error):
-        return jsonify({
-            "status": "error",
-            "error": "method_not_allowed",
-            "message": "The request method is not allowed for this endpoint"
-        }), 405
+        return Response(_METHOD_NOT_ALLOWED_BODY, status=405, mimetype='application/json')
+    
+    @app.errorhandler(413)
+    def payload_too_large(error):
+        return Response(_PAYLOAD_TOO_LARGE_BODY, status=413, mimetype='application/json')
     
     @app.errorhandler(500)
     def internal_error(error):
-        logger.error(f"Internal server error: {error}")
-        return jsonify({
-            "status": "error",
-            "error": "internal_server_error",
-            "message": "An internal server error occurred"
-        }), 500
+        logger.error("Internal server error: %s", error)
+        return Response(_INTERNAL_ERROR_BODY, status=500, mimetype='application/json')
     
     logger.info("Flask application created and configured successfully")
     return app
 
-# Create app instance
+# Create app instance (served by Gunicorn: gunicorn -c gunicorn_conf.py app:app)
 app = create_app()
-
-if __name__ == '__main__':
-    from config import HOST, PORT
-    logger.info(f"Starting AI Agent API Server on {HOST}:{PORT}")
-    app.run(host=HOST, port=PORT, debug=DEBUG)
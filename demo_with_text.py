@@ -5,10 +5,9 @@ Shows how to test the API functionality by creating a temporary text file
 in Azure Blob Storage and then processing it through all AI endpoints.
 """
 
-import requests
 import tempfile
 import os
-from azure.storage.blob import BlobServiceClient
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from config import AZURE_STORAGE_CONNECTION_STRING
 
 # API Configuration
@@ -22,6 +21,43 @@ API_KEYS = {
     "/detect-topics": "topics-key-123"
 }
 
+# Shared HTTP session and blob client, created on first use so heavy SDK imports
+# stay off the script's startup path
+_SESSION = None
+_BLOB_SVC = None
+
+def get_session():
+    """Return the shared HTTP session so every endpoint test reuses the same keep-alive connection"""
+    global _SESSION
+    if _SESSION is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
+        _SESSION = requests.Session()
+        _SESSION.headers.update({"Content-Type": "application/json"})
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=10,
+            max_retries=Retry(total=3, backoff_factor=0.2)
+        )
+        _SESSION.mount("http://", adapter)
+        _SESSION.mount("https://", adapter)
+    return _SESSION
+
+def get_blob_service():
+    """Return the shared blob client so the Azure HTTP pipeline (and its connection pool) is built once"""
+    global _BLOB_SVC
+    if _BLOB_SVC is None:
+        from azure.storage.blob import BlobServiceClient
+        
+        _BLOB_SVC = BlobServiceClient.from_connection_string(
+            AZURE_STORAGE_CONNECTION_STRING,
+            connection_timeout=10,
+            read_timeout=30
+        )
+    return _BLOB_SVC
+
 SAMPLE_TEXT = """
 Customer Feedback Report - Q4 2024
 
@@ -49,45 +85,56 @@ Phone: +1-555-0123
 Address: 123 Main Street, New York, NY 10001
 """
 
+# Demo container and the sample documents uploaded into it
+DEMO_CONTAINER = "demo"
+SAMPLE_DOCUMENTS = {
+    "sample-feedback.txt": SAMPLE_TEXT
+}
+
 def upload_sample_text():
     """Upload sample text to Azure Blob Storage for testing"""
     try:
-        blob_service_client = BlobServiceClient.from_connection_string(AZURE_STORAGE_CONNECTION_STRING)
+        blob_service_client = get_blob_service()
         
         # Create container if it doesn't exist
-        container_name = "demo"
-        try:
-            blob_service_client.create_container(container_name)
-            print(f"Created container: {container_name}")
-        except Exception:
+        container_name = DEMO_CONTAINER
+        container_client = blob_service_client.get_container_client(container_name)
+        if container_client.exists():
             print(f"Container {container_name} already exists")
+        else:
+            container_client.create_container()
+            print(f"Created container: {container_name}")
         
-        # Upload sample text
-        blob_name = "sample-feedback.txt"
-        blob_client = blob_service_client.get_blob_client(
-            container=container_name, 
-            blob=blob_name
-        )
-        
-        blob_client.upload_blob(SAMPLE_TEXT, overwrite=True)
-        print(f"Uploaded sample text to: {container_name}/{blob_name}")
+        # Upload sample documents (the Batch API does not cover uploads, so fan out over threads)
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            list(executor.map(
+                lambda item: container_client.upload_blob(item[0], item[1], overwrite=True),
+                SAMPLE_DOCUMENTS.items()
+            ))
+        for blob_name in SAMPLE_DOCUMENTS:
+            print(f"Uploaded sample text to: {container_name}/{blob_name}")
         
-        return f"{container_name}/{blob_name}"
+        return f"{container_name}/{next(iter(SAMPLE_DOCUMENTS))}"
         
     except Exception as e:
         print(f"Failed to upload sample text: {e}")
         return None
 
+def delete_sample_text():
+    """Delete the uploaded sample documents in a single Blob Batch request"""
+    try:
+        container_client = get_blob_service().get_container_client(DEMO_CONTAINER)
+        container_client.delete_blobs(*SAMPLE_DOCUMENTS)
+        print(f"Deleted {len(SAMPLE_DOCUMENTS)} sample document(s) from: {DEMO_CONTAINER}")
+    except Exception as e:
+        print(f"Failed to delete sample text: {e}")
+
 def test_endpoint(endpoint_path, api_key, data):
     """Test a specific API endpoint"""
     url = f"{BASE_URL}{endpoint_path}"
-    headers = {
-        "Content-Type": "application/json",
-        "X-API-Key": api_key
-    }
     
     try:
-        response = requests.post(url, json=data, headers=headers, timeout=30)
+        response = get_session().post(url, json=data, headers={"X-API-Key": api_key}, timeout=30)
         return response
     except Exception as e:
         print(f"Request failed: {e}")
@@ -138,53 +185,62 @@ def demonstrate_ai_capabilities(file_path):
         }
     ]
     
-    for test in tests:
-        print(f"\n{test['name']}")
-        print("-" * len(test['name']))
-        print(f"Description: {test['description']}")
-        
-        api_key = API_KEYS.get(test['endpoint'])
-        response = test_endpoint(test['endpoint'], api_key, test['data'])
+    # Endpoints are independent, so run them concurrently over the shared session
+    # and report each result as soon as it completes
+    get_session()
+    with ThreadPoolExecutor(max_workers=len(tests)) as executor:
+        futures = {
+            executor.submit(test_endpoint, test['endpoint'], API_KEYS.get(test['endpoint']), test['data']): test
+            for test in tests
+        }
+        for future in as_completed(futures):
+            print_test_result(futures[future], future.result())
+
+def print_test_result(test, response):
+    """Print the outcome of a single endpoint test"""
+    print(f"\n{test['name']}")
+    print("-" * len(test['name']))
+    print(f"Description: {test['description']}")
+    
+    if response and response.status_code == 200:
+        print("Status: SUCCESS")
+        result = response.json()
         
-        if response and response.status_code == 200:
-            print("Status: SUCCESS")
-            result = response.json()
+        # Display key results based on endpoint
+        if test['endpoint'] == '/summarize':
+            summary = result['data'].get('summary', '')
+            print(f"Summary: {summary[:200]}...")
             
-            # Display key results based on endpoint
-            if test['endpoint'] == '/summarize':
-                summary = result['data'].get('summary', '')
-                print(f"Summary: {summary[:200]}...")
-                
-            elif test['endpoint'] == '/sentiment':
-                sentiment = result['data'].get('sentiment')
-                confidence = result['data'].get('confidence')
-                print(f"Sentiment: {sentiment} (confidence: {confidence})")
-                
-            elif test['endpoint'] == '/extract-keywords':
-                keywords = result['data'].get('keywords', [])
-                print(f"Keywords: {', '.join(keywords[:10])}")
-                
-            elif test['endpoint'] == '/translate':
-                translated = result['data'].get('translated_text', '')
-                print(f"Translation: {translated[:200]}...")
-                
-            elif test['endpoint'] == '/structure-data':
-                structured = result['data'].get('structured_data', {})
-                names = structured.get('names', {}).get('people', [])
-                amounts = structured.get('amounts', {}).get('monetary', [])
-                print(f"People: {', '.join(names)}")
-                print(f"Amounts: {', '.join(amounts)}")
-                
-            elif test['endpoint'] == '/detect-topics':
-                topics = result['data'].get('topics', [])
-                topic_names = [t.get('name') for t in topics[:5]]
-                print(f"Topics: {', '.join(topic_names)}")
-                
-        else:
-            print(f"Status: FAILED ({response.status_code if response else 'No response'})")
-            if response:
-                error = response.json().get('message', 'Unknown error')
-                print(f"Error: {error}")
+        elif test['endpoint'] == '/sentiment':
+            sentiment = result['data'].get('sentiment')
+            confidence = result['data'].get('confidence')
+            print(f"Sentiment: {sentiment} (confidence: {confidence})")
+            
+        elif test['endpoint'] == '/extract-keywords':
+            keywords = result['data'].get('keywords', [])
+            print(f"Keywords: {', '.join(keywords[:10])}")
+            
+        elif test['endpoint'] == '/translate':
+            translated = result['data'].get('translated_text', '')
+            print(f"Translation: {translated[:200]}...")
+            
+        elif test['endpoint'] == '/structure-data':
+            structured = result['data'].get('structured_data', {})
+            names = structured.get('names', {}).get('people', [])
+            amounts = structured.get('amounts', {}).get('monetary', [])
+            print(f"People: {', '.join(names)}")
+            print(f"Amounts: {', '.join(amounts)}")
+            
+        elif test['endpoint'] == '/detect-topics':
+            topics = result['data'].get('topics', [])
+            topic_names = [t.get('name') for t in topics[:5]]
+            print(f"Topics: {', '.join(topic_names)}")
+            
+    else:
+        print(f"Status: FAILED ({response.status_code if response else 'No response'})")
+        if response:
+            error = response.json().get('message', 'Unknown error')
+            print(f"Error: {error}")
 
 def main():
     """Main demonstration function"""
@@ -206,6 +262,10 @@ def main():
     print("\nStep 2: Testing AI capabilities...")
     demonstrate_ai_capabilities(file_path)
     
+    # Remove the temporary sample documents
+    print("\nStep 3: Cleaning up sample documents...")
+    delete_sample_text()
+    
     print("\n" + "="*60)
     print("DEMONSTRATION COMPLETE")
     print("="*60)
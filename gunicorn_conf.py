@@ -0,0 +1,24 @@
+import multiprocessing
+import os
+
+# Patch the standard library before anything else imports sockets so that
+# requests, openai and azure-storage-blob calls yield to other greenlets
+from gevent import monkey
+monkey.patch_all()
+
+from config import HOST, PORT, DEBUG
+
+# Server socket
+bind = f"{HOST}:{PORT}"
+
+# Worker processes - async workers multiplex many in-flight OpenAI/Azure calls
+worker_class = "gevent"
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 1000))
+keepalive = 5
+timeout = 120
+
+# Logging
+loglevel = "debug" if DEBUG else "info"
+accesslog = "-"
+errorlog = "-"
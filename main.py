@@ -1,20 +1,35 @@
-from app import app
-from config import HOST, PORT, DEBUG
+import sys
 import logging
+from gunicorn.app.wsgiapp import run
+from config import HOST, PORT, DEBUG
 
 logger = logging.getLogger(__name__)
 
+if __name__ != '__main__':
+    # Compatibility export so `gunicorn ... main:app` keeps working. Not imported
+    # when run directly: the app must load after gunicorn_conf.py patches gevent.
+    from app import app  # noqa: F401
+
 if __name__ == '__main__':
-    logger.info(f"Starting AI Agent API Server on {HOST}:{PORT}")
-    logger.info(f"Debug mode: {DEBUG}")
+    logging.basicConfig(level=logging.INFO)
+    logger.info("Starting AI Agent API Server on %s:%s", HOST, PORT)
+    logger.info("Debug mode: %s", DEBUG)
     logger.info("Available endpoints:")
     logger.info("  GET  / - API documentation")
     logger.info("  GET  /health - Health check")
     logger.info("  POST /summarize - Document summarization")
+    logger.info("  POST /summarize/stream - Document summarization (server-sent events)")
     logger.info("  POST /sentiment - Sentiment analysis")
     logger.info("  POST /extract-keywords - Keyword extraction")
     logger.info("  POST /translate - Language translation")
+    logger.info("  POST /translate/stream - Language translation (server-sent events)")
     logger.info("  POST /structure-data - Structured data extraction")
     logger.info("  POST /detect-topics - Topic detection")
+    logger.info("  POST /analyze - Multiple tasks in one call")
+    logger.info("  POST /summarize-batch - Summarize several documents")
+    logger.info("  POST /batch - Submit an OpenAI batch job")
+    logger.info("  GET  /batch - Batch job status and results")
     
-    app.run(host=HOST, port=PORT, debug=DEBUG)
+    # Hand off to Gunicorn with gevent workers (see gunicorn_conf.py)
+    sys.argv = ["gunicorn", "-c", "gunicorn_conf.py", "app:app"]
+    run()
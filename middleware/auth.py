@@ -1,54 +1,93 @@
+import hmac
+import hashlib
 import logging
 from functools import wraps
-from flask import request, jsonify
+import orjson
+import redis
+from flask import request, g, jsonify, make_response, Response
 from config import API_KEYS
+from services.redis_cache import redis_client
 
 logger = logging.getLogger(__name__)
 
-def require_api_key(endpoint_path):
+_BEARER = 'Bearer '
+_STREAM_SUFFIX = '/stream'
+
+# Pre-serialized bodies for the authentication failure paths
+_MISSING_KEY_BODY = orjson.dumps({
+    "error": "API key required",
+    "message": "Please provide API key in X-API-Key header or Authorization header"
+})
+_INVALID_KEY_BODY = orjson.dumps({
+    "error": "Invalid API key",
+    "message": "The provided API key is not valid for this endpoint"
+})
+_INVALID_REQUEST_BODY = orjson.dumps({
+    "error": "Invalid request",
+    "message": "Request must contain JSON data or form data"
+})
+
+def authenticate_request():
     """
-    Decorator to require API key authentication for specific endpoints
+    before_request hook enforcing endpoint-specific API keys
     
-    Args:
-        endpoint_path (str): The endpoint path to validate against
+    Runs once per request for every path listed in API_KEYS; other paths
+    (root, health, unknown routes) pass through untouched.
+    
+    Returns:
+        Response: Error response if authentication fails, otherwise None
     """
-    def decorator(f):
-        @wraps(f)
-        def decorated_function(*args, **kwargs):
-            # Get API key from headers
-            api_key = request.headers.get('X-API-Key') or request.headers.get('Authorization')
-            
-            if api_key and api_key.startswith('Bearer '):
-                api_key = api_key[7:]  # Remove 'Bearer ' prefix
-            
-            if not api_key:
-                logger.warning(f"Missing API key for endpoint {endpoint_path}")
-                return jsonify({
-                    "error": "API key required",
-                    "message": "Please provide API key in X-API-Key header or Authorization header"
-                }), 401
-            
-            # Check if API key is valid for this endpoint
-            expected_key = API_KEYS.get(endpoint_path)
-            if not expected_key:
-                logger.error(f"No API key configured for endpoint {endpoint_path}")
-                return jsonify({
-                    "error": "Endpoint not configured",
-                    "message": "This endpoint is not properly configured"
-                }), 500
-            
-            if api_key != expected_key:
-                logger.warning(f"Invalid API key for endpoint {endpoint_path}")
-                return jsonify({
-                    "error": "Invalid API key",
-                    "message": "The provided API key is not valid for this endpoint"
-                }), 403
-            
-            logger.info(f"Valid API key provided for endpoint {endpoint_path}")
-            return f(*args, **kwargs)
-        
-        return decorated_function
-    return decorator
+    if request.routing_exception is not None:
+        return None
+    
+    # Streaming variants (/summarize/stream) use their endpoint's key
+    endpoint_path = request.path.removesuffix(_STREAM_SUFFIX)
+    try:
+        expected_key = API_KEYS[endpoint_path]
+    except KeyError:
+        return None
+    
+    # Get API key from headers, stripping an optional 'Bearer ' prefix
+    api_key = (
+        request.headers.get('X-API-Key') or request.headers.get('Authorization', '')
+    ).removeprefix(_BEARER).strip()
+    
+    if not api_key:
+        logger.warning("Missing API key for endpoint %s", endpoint_path)
+        return Response(_MISSING_KEY_BODY, status=401, mimetype='application/json')
+    
+    # Check if API key is valid for this endpoint
+    if not expected_key:
+        logger.error("No API key configured for endpoint %s", endpoint_path)
+        return jsonify({
+            "error": "Endpoint not configured",
+            "message": "This endpoint is not properly configured"
+        }), 500
+    
+    # Constant-time compare so response timing does not leak the key
+    if not hmac.compare_digest(api_key.encode(), expected_key.encode()):
+        logger.warning("Invalid API key for endpoint %s", endpoint_path)
+        return Response(_INVALID_KEY_BODY, status=403, mimetype='application/json')
+    
+    logger.debug("Valid API key provided for endpoint %s", endpoint_path)
+    return None
+
+def get_request_data():
+    """
+    Parse the request body once, dispatching on the request mimetype
+    
+    JSON requests never touch Werkzeug's form parser; the result is stored on
+    flask.g so every decorator in the chain shares the same parse.
+    
+    Returns:
+        dict: Parsed JSON body or form data (None for malformed JSON)
+    """
+    if 'request_data' not in g:
+        if request.mimetype == 'application/json':
+            g.request_data = request.get_json(cache=True, silent=True)
+        else:
+            g.request_data = request.form
+    return g.request_data
 
 def validate_request_data(required_fields=None):
     """
@@ -57,26 +96,85 @@ def validate_request_data(required_fields=None):
     Args:
         required_fields (list): List of required field names
     """
+    required = frozenset(required_fields or ())
+    
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            if required_fields:
-                data = request.get_json() if request.is_json else request.form
+            if required:
+                data = get_request_data()
                 
                 if not data:
-                    return jsonify({
-                        "error": "Invalid request",
-                        "message": "Request must contain JSON data or form data"
-                    }), 400
+                    return Response(_INVALID_REQUEST_BODY, status=400, mimetype='application/json')
                 
-                missing_fields = [field for field in required_fields if field not in data]
-                if missing_fields:
-                    return jsonify({
+                missing = required.difference(data)
+                if missing:
+                    missing_fields = [field for field in required_fields if field in missing]
+                    return Response(orjson.dumps({
                         "error": "Missing required fields",
                         "message": f"The following fields are required: {', '.join(missing_fields)}"
-                    }), 400
+                    }), status=400, mimetype='application/json')
             
             return f(*args, **kwargs)
         
         return decorated_function
     return decorator
+
+def cache_response(ttl, version):
+    """
+    Decorator to cache successful JSON responses in Redis
+    
+    The cache key is derived from the endpoint path, the version of the
+    documents the request reads and the normalized JSON body, so identical
+    requests skip the file download and OpenAI round-trip while an overwritten
+    document is never answered from a stale entry.
+    
+    Args:
+        ttl (int): Time to live for cached responses in seconds
+        version (callable): Takes the parsed request body and returns a string
+            identifying the current version of its documents (e.g. blob ETags),
+            or None to bypass the cache for this request
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            data = get_request_data()
+            if redis_client is None or not isinstance(data, dict) or request.mimetype != 'application/json':
+                return f(*args, **kwargs)
+            
+            try:
+                body = orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+            except TypeError:
+                # e.g. integers beyond 64 bits; such requests are simply not cached
+                return f(*args, **kwargs)
+            
+            document_version = version(data)
+            if document_version is None:
+                return f(*args, **kwargs)
+            key = "resp:" + hashlib.sha256(
+                request.path.encode() + b"\0" + document_version.encode() + b"\0" + body
+            ).hexdigest()
+            
+            try:
+                cached = redis_client.get(key)
+            except redis.RedisError as e:
+                logger.warning("Response cache unavailable: %s", e)
+                return f(*args, **kwargs)
+            
+            if cached is not None:
+                response = make_response(cached)
+                response.mimetype = "application/json"
+                response.headers["X-Cache"] = "HIT"
+                return response
+            
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                try:
+                    redis_client.setex(key, ttl, response.get_data())
+                except redis.RedisError as e:
+                    logger.warning("Failed to cache response for %s: %s", request.path, e)
+            response.headers["X-Cache"] = "MISS"
+            return response
+        
+        return decorated_function
+    return decorator
@@ -1,66 +1,331 @@
 import logging
-from flask import Blueprint, request, jsonify
-from middleware.auth import require_api_key, validate_request_data
-from services.azure_storage import AzureBlobStorage
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import orjson
+from flask import Blueprint, request, g, Response, stream_with_context
+from middleware.auth import validate_request_data, cache_response
+from services.azure_storage import AzureBlobStorage, BlobTooLargeError
+from services.batch_processor import BatchProcessor
 from services.file_processor import FileProcessor
-from services.openai_service import OpenAIService
-from utils.helpers import create_success_response, create_error_response, log_request_info, validate_file_path
+from services.openai_service import OpenAIService, MULTI_TASK_SPECS, parse_task_result
+from services.redis_cache import redis_client
+from services.semantic_cache import SemanticCache
+from services.text_cache import TextCache
+from utils.helpers import create_success_response, create_success_json, create_error_response, log_request_info, validate_file_path
+from config import SEMANTIC_CACHE_ENABLED, SEMANTIC_CACHE_MAX_DISTANCE, MAX_BLOB_BYTES, TEXT_CACHE_TTL
 
 logger = logging.getLogger(__name__)
 
 # Create blueprint for AI endpoints
 ai_bp = Blueprint('ai_endpoints', __name__)
 
-# Initialize services
-azure_storage = AzureBlobStorage()
 file_processor = FileProcessor()
-openai_service = OpenAIService()
 
-@ai_bp.route('/summarize', methods=['POST'])
-@require_api_key('/summarize')
-@validate_request_data(['file_path'])
-def summarize_document():
+# Service clients are built on first use rather than at import, so worker boot
+# does not pay for client setup (or the semantic cache's Redis index check)
+@lru_cache(maxsize=1)
+def get_azure_storage():
+    """Return the shared Azure Blob Storage service"""
+    return AzureBlobStorage()
+
+@lru_cache(maxsize=1)
+def get_openai_service():
+    """Return the shared OpenAI service"""
+    return OpenAIService()
+
+@lru_cache(maxsize=1)
+def get_batch_processor():
+    """Return the shared OpenAI Batch API processor"""
+    return BatchProcessor(get_openai_service().client)
+
+@lru_cache(maxsize=1)
+def get_text_cache():
+    """Return the shared extracted-text cache"""
+    return TextCache(redis_client, ttl=900, redis_ttl=TEXT_CACHE_TTL)
+
+@lru_cache(maxsize=1)
+def get_semantic_cache():
+    """Return the shared result cache (embedding tier disabled unless SEMANTIC_CACHE_ENABLED)"""
+    return SemanticCache(
+        redis_client,
+        get_openai_service().client,
+        max_distance=SEMANTIC_CACHE_MAX_DISTANCE,
+        semantic=SEMANTIC_CACHE_ENABLED
+    )
+
+def get_document_text(file_path):
     """
-    Summarize document content from Azure Blob Storage
+    Fetch and extract the text of a blob, memoized by the blob's ETag
+    
+    Endpoints are commonly called back-to-back on the same file, so the
+    extracted text is cached and only re-downloaded when the blob changes
+    (checked with a conditional GET on the cached ETag).
+    Blobs over MAX_BLOB_BYTES raise BlobTooLargeError, except text files,
+    which are read up to the limit.
+    
+    Args:
+        file_path (str): Blob URL or container/blob_name path
+        
+    Returns:
+        tuple: (text_content, file_properties)
+    """
+    azure_storage = get_azure_storage()
+    text_cache = get_text_cache()
+    
+    # The ETag of the last cached version turns the download into a conditional
+    # GET, so an unchanged blob costs one bodiless 304 (its properties are
+    # cached with the text)
+    cached_etag = text_cache.last_etag(file_path)
+    try:
+        file_properties, stream = azure_storage.download_with_properties(
+            file_path, max_bytes=MAX_BLOB_BYTES, if_none_match=cached_etag
+        )
+        if stream is None:
+            cached = text_cache.get(file_path, cached_etag)
+            if cached is not None:
+                return cached
+            # Unchanged blob, but its text has since been evicted
+            file_properties, stream = azure_storage.download_with_properties(
+                file_path, max_bytes=MAX_BLOB_BYTES
+            )
+    except BlobTooLargeError as e:
+        # Text is cut to a token budget anyway, so only its head is needed
+        if not file_processor.is_text_type(e.content_type, e.blob_name):
+            raise
+        file_properties, stream = azure_storage.download_with_properties(file_path, length=MAX_BLOB_BYTES)
+        # A ranged download reports the range length; keep the full blob size
+        file_properties['size'] = e.size
+        truncated = True
+    else:
+        truncated = False
+    
+    # Content is spooled to a temp file and handed to the parser as a file object
+    with stream as file_content:
+        digest = text_cache.content_digest(file_content)
+        text_content = text_cache.get_by_content(digest)
+        if text_content is None:
+            text_content = file_processor.extract_text_from_content(
+                file_content, 
+                file_properties.get('content_type'), 
+                file_properties.get('name'),
+                truncated=truncated
+            )
+            text_cache.set_by_content(digest, text_content)
+    
+    text_cache.set(file_path, file_properties.get('etag'), text_content, file_properties)
+    return text_content, file_properties
+
+def get_request_document(file_path):
+    """
+    get_document_text memoized on flask.g for the current request
+    
+    The response cache resolves the document's ETag before the handler runs;
+    the handler then reuses that fetch instead of revalidating the blob again.
+    """
+    documents = g.setdefault('documents', {})
+    if file_path not in documents:
+        documents[file_path] = get_document_text(file_path)
+    return documents[file_path]
+
+def _document_version(data):
+    """Response cache version for single-document routes: the blob's current ETag"""
+    file_path = data.get('file_path')
+    if not isinstance(file_path, str) or not validate_file_path(file_path):
+        return None
+    try:
+        _, file_properties = get_request_document(file_path)
+    except Exception:
+        # Not cached; the handler fetches again and reports the failure
+        return None
+    return file_properties.get('etag')
+
+def run_with_semantic_cache(task, text_content, compute, *args, semantic=True):
+    """
+    Run an OpenAI task, reusing the result for the same or a semantically similar document
+    
+    Args:
+        task (str): Task namespace, including any parameters that change the output
+        text_content (str): Document text content
+        compute (callable): OpenAIService method to call on a miss
+        *args: Extra arguments for compute after the text
+        semantic (bool): Accept near-duplicate documents, not just identical text
+        
+    Returns:
+        Dict[str, Any]: Task result
+    """
+    result, hit = _semantic_lookup_or_compute(task, text_content, compute, *args, semantic=semantic)
+    if hit:
+        g.semantic_cache_hit = True
+    return result
+
+def _semantic_lookup_or_compute(task, text_content, compute, *args, semantic=True):
+    """Semantic cache lookup without touching flask.g, safe to call from worker threads"""
+    semantic_cache = get_semantic_cache()
+    cached, vector = semantic_cache.lookup(task, text_content, semantic=semantic)
+    if cached is not None:
+        return cached, True
+    
+    result = compute(text_content, *args)
+    if result.get('success'):
+        semantic_cache.store(task, text_content, vector, result)
+    return result, False
+
+@ai_bp.after_request
+def mark_semantic_cache_hit(response):
+    """Flag responses served from the semantic cache"""
+    if g.get('semantic_cache_hit'):
+        response.headers['X-Cache'] = 'SEMANTIC-HIT'
+    return response
+
+# Single-task endpoints: route -> how to run the task and shape its response
+# ('compute' names the OpenAIService method, 'max_tokens' is the document token
+# budget, and with 'chunk_tokens' compute receives the text split into chunks;
+# 'stream' names the method yielding text deltas for the /<task>/stream route).
+# Every route shares the same fetch/extract/truncate/dispatch flow in run_task,
+# so caching and error handling changes apply to all of them at once.
+TASKS = {
+    'summarize': {
+        'endpoint': 'summarize_document',
+        'compute': 'summarize_chunks',
+        'stream': 'stream_summary',
+        # Long documents are summarized in 8k-token chunks, then combined
+        'chunk_tokens': 8000,
+        'max_tokens': 64000,
+        'ttl': 4 * 3600,
+        'error': 'summarization_failed',
+        'message': 'Document summarized successfully',
+        'fields': lambda result: {
+            "summary": result.get('summary'),
+            "original_length": result.get('original_length'),
+            "summary_length": result.get('summary_length')
+        }
+    },
+    'sentiment': {
+        'endpoint': 'analyze_sentiment',
+        'compute': 'analyze_sentiment',
+        'max_tokens': 6000,
+        'ttl': 3600,
+        'error': 'sentiment_analysis_failed',
+        'message': 'Sentiment analysis completed successfully',
+        'fields': lambda result: {
+            "sentiment": result.get('sentiment'),
+            "confidence": result.get('confidence'),
+            "explanation": result.get('explanation')
+        }
+    },
+    'extract-keywords': {
+        'endpoint': 'extract_keywords',
+        'compute': 'extract_keywords',
+        'max_tokens': 12000,
+        'ttl': 4 * 3600,
+        'error': 'keyword_extraction_failed',
+        'message': 'Keywords extracted successfully',
+        'fields': lambda result: {
+            "keywords": result.get('keywords'),
+            "keyword_count": result.get('count')
+        }
+    },
+    'translate': {
+        'endpoint': 'translate_document',
+        'compute': 'translate_text',
+        'stream': 'stream_translation',
+        'params': ['target_language'],
+        'max_tokens': 12000,  # Smaller limit for translation
+        # A near-duplicate document's translation is not a translation of this one
+        'semantic': False,
+        'ttl': 24 * 3600,
+        'error': 'translation_failed',
+        'message': 'Document translated successfully',
+        'fields': lambda result: {
+            "translated_text": result.get('translated_text'),
+            "source_language": result.get('source_language'),
+            "target_language": result.get('target_language'),
+            "original_length": result.get('original_length'),
+            "translated_length": result.get('translated_length')
+        }
+    },
+    'structure-data': {
+        'endpoint': 'structure_document_data',
+        'compute': 'structure_data',
+        'ttl': 4 * 3600,
+        'error': 'data_structuring_failed',
+        'message': 'Structured data extracted successfully',
+        'fields': lambda result: {
+            "structured_data": result.get('structured_data')
+        }
+    },
+    'detect-topics': {
+        'endpoint': 'detect_document_topics',
+        'compute': 'detect_topics',
+        'max_tokens': 12000,
+        'ttl': 4 * 3600,
+        'error': 'topic_detection_failed',
+        'message': 'Topics detected successfully',
+        'fields': lambda result: {
+            "topics": result.get('topics'),
+            "topic_count": result.get('topic_count')
+        }
+    }
+}
+
+def run_task(task_name):
+    """
+    Run a single AI task on a document from Azure Blob Storage
     
     Expected JSON payload:
     {
         "file_path": "https://storagetest12344.blob.core.windows.net/container/filename.pdf"
     }
+    Tasks with extra parameters (e.g. translate's "target_language") take them
+    as additional fields.
+    
+    Args:
+        task_name (str): Key into TASKS
+        
+    Returns:
+        Response: Task result or error response
     """
+    spec = TASKS[task_name]
+    params = spec.get('params', [])
     try:
         data = request.get_json()
         file_path = data.get('file_path')
+        args = [data.get(param) for param in params]
         
-        log_request_info('summarize', file_path)
+        log_request_info(task_name, file_path, dict(zip(params, args)) or None)
         
-        if not validate_file_path(file_path):
+        if not isinstance(file_path, str) or not validate_file_path(file_path):
             return create_error_response(
                 "invalid_file_path", 
                 "Invalid file path format", 
                 400
             )
         
-        # Download file from Azure Blob Storage
-        file_content = azure_storage.download_blob_content(file_path)
-        file_properties = azure_storage.get_blob_properties(file_path)
+        for param, arg in zip(params, args):
+            if not isinstance(arg, str):
+                return create_error_response(
+                    f"invalid_{param}", 
+                    f"{param} must be a string", 
+                    400
+                )
         
-        # Extract text content
-        text_content = file_processor.extract_text_from_content(
-            file_content, 
-            file_properties.get('content_type'), 
-            file_properties.get('name')
-        )
+        # Fetch and extract document text (cached by blob ETag)
+        text_content, file_properties = get_request_document(file_path)
         
-        # Validate text length
-        text_content, was_truncated = file_processor.validate_text_length(text_content)
+        text_content, was_truncated = file_processor.validate_text_length(
+            text_content, spec.get('max_tokens', 20000)
+        )
         
-        # Generate summary
-        result = openai_service.summarize_document(text_content)
+        # Parameters that change the output are part of the semantic cache namespace
+        namespace = ':'.join([task_name, *map(str, args)])
+        compute = _task_compute(spec)
+        result = run_with_semantic_cache(
+            namespace, text_content, compute, *args, semantic=spec.get('semantic', True)
+        )
         
         if not result.get('success'):
             return create_error_response(
-                "summarization_failed", 
+                spec['error'], 
                 result.get('error'), 
                 500
             )
@@ -68,365 +333,635 @@ def summarize_document():
         response_data = {
             "file_path": file_path,
             "file_properties": file_properties,
-            "summary": result.get('summary'),
-            "original_length": result.get('original_length'),
-            "summary_length": result.get('summary_length'),
+            **spec['fields'](result),
             "was_truncated": was_truncated
         }
         
-        return jsonify(create_success_response(response_data, "Document summarized successfully"))
+        return create_success_json(response_data, spec['message'])
         
     except FileNotFoundError as e:
         return create_error_response("file_not_found", str(e), 404)
+    except BlobTooLargeError as e:
+        return create_error_response("file_too_large", str(e), 413)
     except ValueError as e:
         return create_error_response("processing_error", str(e), 400)
     except Exception as e:
-        logger.error(f"Error in summarize endpoint: {e}")
+        logger.error("Error in %s endpoint: %s", task_name, e)
         return create_error_response("internal_error", "An unexpected error occurred", 500)
 
-@ai_bp.route('/sentiment', methods=['POST'])
-@require_api_key('/sentiment')
-@validate_request_data(['file_path'])
-def analyze_sentiment():
+def _task_compute(spec, method='compute'):
     """
-    Analyze sentiment of document content from Azure Blob Storage
+    Resolve a TASKS entry to a callable taking the document text and task arguments
     
-    Expected JSON payload:
-    {
-        "file_path": "https://storagetest12344.blob.core.windows.net/container/filename.pdf"
-    }
+    Args:
+        spec (dict): TASKS entry
+        method (str): Spec key naming the OpenAIService method ('compute' or 'stream')
+        
+    Returns:
+        callable: OpenAIService method, wrapped to split the text when chunking
     """
+    compute = getattr(get_openai_service(), spec[method])
+    chunk_tokens = spec.get('chunk_tokens')
+    if not chunk_tokens:
+        return compute
+    return lambda text_content, *args: compute(file_processor.split_text(text_content, chunk_tokens), *args)
+
+def _sse(event, payload):
+    """Format one server-sent event with a JSON payload"""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(payload) + b"\n\n"
+
+def run_task_stream(task_name):
+    """
+    Run a plain-text AI task and stream its output as server-sent events
+    
+    Takes the same JSON payload as the matching non-streaming endpoint.
+    Emits "delta" events ({"delta": "..."}) as the text is generated, then
+    one "done" event with the non-streaming response data, or an "error"
+    event. Request errors are returned as normal JSON error responses
+    before the stream starts.
+    
+    Args:
+        task_name (str): Key into TASKS with a 'stream' method
+        
+    Returns:
+        Response: text/event-stream response or error response
+    """
+    spec = TASKS[task_name]
+    params = spec.get('params', [])
     try:
         data = request.get_json()
         file_path = data.get('file_path')
+        args = [data.get(param) for param in params]
         
-        log_request_info('sentiment', file_path)
+        log_request_info(f"{task_name}/stream", file_path, dict(zip(params, args)) or None)
         
-        if not validate_file_path(file_path):
+        if not isinstance(file_path, str) or not validate_file_path(file_path):
             return create_error_response(
                 "invalid_file_path", 
                 "Invalid file path format", 
                 400
             )
         
-        # Download and process file
-        file_content = azure_storage.download_blob_content(file_path)
-        file_properties = azure_storage.get_blob_properties(file_path)
-        
-        text_content = file_processor.extract_text_from_content(
-            file_content, 
-            file_properties.get('content_type'), 
-            file_properties.get('name')
-        )
-        
-        text_content, was_truncated = file_processor.validate_text_length(text_content)
+        for param, arg in zip(params, args):
+            if not isinstance(arg, str):
+                return create_error_response(
+                    f"invalid_{param}", 
+                    f"{param} must be a string", 
+                    400
+                )
         
-        # Analyze sentiment
-        result = openai_service.analyze_sentiment(text_content)
-        
-        if not result.get('success'):
-            return create_error_response(
-                "sentiment_analysis_failed", 
-                result.get('error'), 
-                500
-            )
+        # Fetch and extract document text (cached by blob ETag)
+        text_content, file_properties = get_document_text(file_path)
         
-        response_data = {
-            "file_path": file_path,
-            "file_properties": file_properties,
-            "sentiment": result.get('sentiment'),
-            "confidence": result.get('confidence'),
-            "explanation": result.get('explanation'),
-            "was_truncated": was_truncated
-        }
+        text_content, was_truncated = file_processor.validate_text_length(
+            text_content, spec.get('max_tokens', 20000)
+        )
         
-        return jsonify(create_success_response(response_data, "Sentiment analysis completed successfully"))
+        namespace = ':'.join([task_name, *map(str, args)])
+        semantic_cache = get_semantic_cache()
+        cached, vector = semantic_cache.lookup(namespace, text_content, semantic=spec.get('semantic', True))
+        stream = None if cached is not None else _task_compute(spec, 'stream')(text_content, *args)
         
     except FileNotFoundError as e:
         return create_error_response("file_not_found", str(e), 404)
+    except BlobTooLargeError as e:
+        return create_error_response("file_too_large", str(e), 413)
     except ValueError as e:
         return create_error_response("processing_error", str(e), 400)
     except Exception as e:
-        logger.error(f"Error in sentiment endpoint: {e}")
+        logger.error("Error in %s/stream endpoint: %s", task_name, e)
         return create_error_response("internal_error", "An unexpected error occurred", 500)
+    
+    def events():
+        result = cached
+        if result is None:
+            parts = []
+            try:
+                for delta in stream:
+                    parts.append(delta)
+                    yield _sse("delta", {"delta": delta})
+            except Exception as e:
+                logger.error("Error streaming %s: %s", task_name, e)
+                yield _sse("error", {"status": "error", "error": spec['error'], "message": str(e)})
+                return
+            result = parse_task_result(
+                task_name, ''.join(parts), len(text_content), *args
+            )
+            semantic_cache.store(namespace, text_content, vector, result)
+        
+        yield _sse("done", create_success_response({
+            "file_path": file_path,
+            "file_properties": file_properties,
+            **spec['fields'](result),
+            "was_truncated": was_truncated
+        }, spec['message']))
+    
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
-@ai_bp.route('/extract-keywords', methods=['POST'])
-@require_api_key('/extract-keywords')
-@validate_request_data(['file_path'])
-def extract_keywords():
+def _register_task_route(task_name, spec):
+    """Expose one TASKS entry as a POST route with caching and field validation"""
+    def view():
+        return run_task(task_name)
+    view.__name__ = spec['endpoint']
+    view.__doc__ = run_task.__doc__
+    
+    params = spec.get('params', [])
+    view_func = cache_response(ttl=spec['ttl'], version=_document_version)(
+        validate_request_data(['file_path', *params])(view)
+    )
+    ai_bp.add_url_rule(f'/{task_name}', endpoint=spec['endpoint'], view_func=view_func, methods=['POST'])
+    
+    if 'stream' in spec:
+        # Streamed output is never stored by the response cache
+        def stream_view():
+            return run_task_stream(task_name)
+        stream_view.__name__ = f"{spec['endpoint']}_stream"
+        stream_view.__doc__ = run_task_stream.__doc__
+        ai_bp.add_url_rule(
+            f'/{task_name}/stream',
+            endpoint=stream_view.__name__,
+            view_func=validate_request_data(['file_path', *params])(stream_view),
+            methods=['POST']
+        )
+
+for _task_name, _spec in TASKS.items():
+    _register_task_route(_task_name, _spec)
+
+# Batch summarization fans out over a bounded pool (greenlets under the gevent
+# worker) so downloads and OpenAI calls for different files overlap without
+# exceeding the OpenAI rate limit
+MAX_BATCH_FILES = 20
+_batch_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="batch")
+
+def _summarize_one(file_path, document=None):
     """
-    Extract keywords from document content from Azure Blob Storage
+    Summarize a single file for /summarize-batch, reporting failures in the item
     
-    Expected JSON payload:
-    {
-        "file_path": "https://storagetest12344.blob.core.windows.net/container/filename.pdf"
-    }
+    Args:
+        file_path (str): Blob URL or container/blob_name path
+        document (tuple): (text_content, file_properties) if already fetched
+        
+    Returns:
+        dict: Per-file result with success flag and either summary fields or an error
     """
+    item = {"file_path": file_path}
     try:
-        data = request.get_json()
-        file_path = data.get('file_path')
-        
-        log_request_info('extract-keywords', file_path)
-        
         if not validate_file_path(file_path):
-            return create_error_response(
-                "invalid_file_path", 
-                "Invalid file path format", 
-                400
-            )
-        
-        # Download and process file
-        file_content = azure_storage.download_blob_content(file_path)
-        file_properties = azure_storage.get_blob_properties(file_path)
-        
-        text_content = file_processor.extract_text_from_content(
-            file_content, 
-            file_properties.get('content_type'), 
-            file_properties.get('name')
-        )
-        
-        text_content, was_truncated = file_processor.validate_text_length(text_content)
+            return {**item, "success": False, "error": "invalid_file_path", "message": "Invalid file path format"}
         
-        # Extract keywords
-        result = openai_service.extract_keywords(text_content)
+        text_content, file_properties = document or get_document_text(file_path)
+        spec = TASKS['summarize']
+        text_content, was_truncated = file_processor.validate_text_length(text_content, spec['max_tokens'])
         
+        result, _ = _semantic_lookup_or_compute('summarize', text_content, _task_compute(spec))
         if not result.get('success'):
-            return create_error_response(
-                "keyword_extraction_failed", 
-                result.get('error'), 
-                500
-            )
+            return {**item, "success": False, "error": "summarization_failed", "message": result.get('error')}
         
-        response_data = {
-            "file_path": file_path,
+        return {
+            **item,
+            "success": True,
             "file_properties": file_properties,
-            "keywords": result.get('keywords'),
-            "keyword_count": result.get('count'),
+            **TASKS['summarize']['fields'](result),
             "was_truncated": was_truncated
         }
         
-        return jsonify(create_success_response(response_data, "Keywords extracted successfully"))
-        
     except FileNotFoundError as e:
-        return create_error_response("file_not_found", str(e), 404)
+        return {**item, "success": False, "error": "file_not_found", "message": str(e)}
+    except BlobTooLargeError as e:
+        return {**item, "success": False, "error": "file_too_large", "message": str(e)}
     except ValueError as e:
-        return create_error_response("processing_error", str(e), 400)
+        return {**item, "success": False, "error": "processing_error", "message": str(e)}
     except Exception as e:
-        logger.error(f"Error in extract-keywords endpoint: {e}")
-        return create_error_response("internal_error", "An unexpected error occurred", 500)
+        logger.error("Error summarizing %s in batch: %s", file_path, e)
+        return {**item, "success": False, "error": "internal_error", "message": "An unexpected error occurred"}
+
+def _fetch_document(file_path):
+    """get_document_text for worker threads, returning None instead of raising"""
+    try:
+        return get_document_text(file_path)
+    except Exception:
+        return None
+
+def _batch_version(data):
+    """
+    Response cache version for /summarize-batch: the current ETags of every file
+    
+    The documents are fetched concurrently here and handed to the handler on
+    flask.g. A batch with any unreadable file is not cached.
+    """
+    file_paths = data.get('file_paths')
+    if (not isinstance(file_paths, list) or not file_paths or len(file_paths) > MAX_BATCH_FILES
+            or not all(isinstance(file_path, str) and validate_file_path(file_path) for file_path in file_paths)):
+        return None
+    
+    documents = g.setdefault('documents', {})
+    etags = []
+    for file_path, document in zip(file_paths, _batch_executor.map(_fetch_document, file_paths)):
+        if document is None:
+            etags.append(None)
+            continue
+        documents[file_path] = document
+        etags.append(document[1].get('etag'))
+    if not all(etags):
+        return None
+    return "\n".join(etags)
 
-@ai_bp.route('/translate', methods=['POST'])
-@require_api_key('/translate')
-@validate_request_data(['file_path', 'target_language'])
-def translate_document():
+@ai_bp.route('/summarize-batch', methods=['POST'])
+@cache_response(ttl=4 * 3600, version=_batch_version)
+@validate_request_data(['file_paths'])
+def summarize_batch():
     """
-    Translate document content from Azure Blob Storage
+    Summarize several documents from Azure Blob Storage in one request
     
     Expected JSON payload:
     {
-        "file_path": "https://storagetest12344.blob.core.windows.net/container/filename.pdf",
-        "target_language": "Hindi"
+        "file_paths": [
+            "container/report.pdf",
+            "container/feedback.txt"
+        ]
     }
     """
     try:
         data = request.get_json()
-        file_path = data.get('file_path')
-        target_language = data.get('target_language')
+        file_paths = data.get('file_paths')
         
-        log_request_info('translate', file_path, {"target_language": target_language})
+        log_request_info('summarize-batch', None, {"file_count": len(file_paths) if isinstance(file_paths, list) else None})
         
-        if not validate_file_path(file_path):
+        if (not isinstance(file_paths, list) or not file_paths
+                or not all(isinstance(file_path, str) for file_path in file_paths)):
             return create_error_response(
-                "invalid_file_path", 
-                "Invalid file path format", 
+                "invalid_file_paths", 
+                "file_paths must be a non-empty list of file paths", 
                 400
             )
         
-        # Download and process file
-        file_content = azure_storage.download_blob_content(file_path)
-        file_properties = azure_storage.get_blob_properties(file_path)
-        
-        text_content = file_processor.extract_text_from_content(
-            file_content, 
-            file_properties.get('content_type'), 
-            file_properties.get('name')
-        )
-        
-        text_content, was_truncated = file_processor.validate_text_length(text_content, 50000)  # Smaller limit for translation
-        
-        # Translate content
-        result = openai_service.translate_text(text_content, target_language)
-        
-        if not result.get('success'):
+        if len(file_paths) > MAX_BATCH_FILES:
             return create_error_response(
-                "translation_failed", 
-                result.get('error'), 
-                500
+                "too_many_files", 
+                f"A batch may contain at most {MAX_BATCH_FILES} files", 
+                400
             )
         
+        # Results keep request order; one failing file does not fail the batch
+        documents = g.get('documents', {})
+        results = list(_batch_executor.map(
+            lambda file_path: _summarize_one(file_path, documents.get(file_path)), file_paths
+        ))
+        succeeded = sum(1 for item in results if item['success'])
+        
         response_data = {
-            "file_path": file_path,
-            "file_properties": file_properties,
-            "translated_text": result.get('translated_text'),
-            "source_language": result.get('source_language'),
-            "target_language": result.get('target_language'),
-            "original_length": result.get('original_length'),
-            "translated_length": result.get('translated_length'),
-            "was_truncated": was_truncated
+            "results": results,
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded
         }
         
-        return jsonify(create_success_response(response_data, "Document translated successfully"))
+        return create_success_json(response_data, "Batch summarization completed")
+        
+    except Exception as e:
+        logger.error("Error in summarize-batch endpoint: %s", e)
+        return create_error_response("internal_error", "An unexpected error occurred", 500)
+
+# Batch API jobs: documents are downloaded now, completions run asynchronously on
+# OpenAI's side at half the price and are collected with GET /batch
+MAX_BATCH_JOB_FILES = 200
+
+def _load_batch_document(file_path, max_tokens):
+    """
+    Fetch and truncate one document for /batch, reporting failures in the item
+    
+    Args:
+        file_path (str): Blob URL or container/blob_name path
+        max_tokens (int): Token budget of the task
+        
+    Returns:
+        tuple: (text or None, error item or None)
+    """
+    item = {"file_path": file_path}
+    try:
+        if not validate_file_path(file_path):
+            return None, {**item, "error": "invalid_file_path", "message": "Invalid file path format"}
+        
+        text_content, _ = get_document_text(file_path)
+        text_content, _ = file_processor.validate_text_length(text_content, max_tokens)
+        return text_content, None
         
     except FileNotFoundError as e:
-        return create_error_response("file_not_found", str(e), 404)
+        return None, {**item, "error": "file_not_found", "message": str(e)}
+    except BlobTooLargeError as e:
+        return None, {**item, "error": "file_too_large", "message": str(e)}
     except ValueError as e:
-        return create_error_response("processing_error", str(e), 400)
+        return None, {**item, "error": "processing_error", "message": str(e)}
     except Exception as e:
-        logger.error(f"Error in translate endpoint: {e}")
-        return create_error_response("internal_error", "An unexpected error occurred", 500)
+        logger.error("Error loading %s for batch job: %s", file_path, e)
+        return None, {**item, "error": "internal_error", "message": "An unexpected error occurred"}
 
-@ai_bp.route('/structure-data', methods=['POST'])
-@require_api_key('/structure-data')
-@validate_request_data(['file_path'])
-def structure_document_data():
+@ai_bp.route('/batch', methods=['POST'])
+@validate_request_data(['task', 'file_paths'])
+def submit_batch():
     """
-    Extract structured data from document content from Azure Blob Storage
+    Submit a task over many documents as an OpenAI batch job
     
     Expected JSON payload:
     {
-        "file_path": "https://storagetest12344.blob.core.windows.net/container/filename.pdf"
+        "task": "summarize",
+        "file_paths": [
+            "container/report.pdf",
+            "container/feedback.txt"
+        ],
+        "target_language": "Hindi"
     }
     """
     try:
         data = request.get_json()
-        file_path = data.get('file_path')
+        task = data.get('task')
+        file_paths = data.get('file_paths')
+        target_language = data.get('target_language')
         
-        log_request_info('structure-data', file_path)
+        log_request_info('batch', None, {"task": task, "file_count": len(file_paths) if isinstance(file_paths, list) else None})
         
-        if not validate_file_path(file_path):
+        if not isinstance(task, str) or task not in TASKS:
             return create_error_response(
-                "invalid_file_path", 
-                "Invalid file path format", 
+                "invalid_task", 
+                f"task must be one of: {', '.join(TASKS)}", 
                 400
             )
         
-        # Download and process file
-        file_content = azure_storage.download_blob_content(file_path)
-        file_properties = azure_storage.get_blob_properties(file_path)
-        
-        text_content = file_processor.extract_text_from_content(
-            file_content, 
-            file_properties.get('content_type'), 
-            file_properties.get('name')
-        )
-        
-        text_content, was_truncated = file_processor.validate_text_length(text_content)
+        if (not isinstance(file_paths, list) or not file_paths
+                or not all(isinstance(file_path, str) for file_path in file_paths)):
+            return create_error_response(
+                "invalid_file_paths", 
+                "file_paths must be a non-empty list of file paths", 
+                400
+            )
+        file_paths = list(dict.fromkeys(file_paths))
         
-        # Extract structured data
-        result = openai_service.structure_data(text_content)
+        if len(file_paths) > MAX_BATCH_JOB_FILES:
+            return create_error_response(
+                "too_many_files", 
+                f"A batch job may contain at most {MAX_BATCH_JOB_FILES} files", 
+                400
+            )
         
-        if not result.get('success'):
+        if task == 'translate' and not target_language:
             return create_error_response(
-                "data_structuring_failed", 
-                result.get('error'), 
-                500
+                "missing_target_language", 
+                "target_language is required for the translate task", 
+                400
+            )
+        if task == 'translate' and not isinstance(target_language, str):
+            return create_error_response(
+                "invalid_target_language", 
+                "target_language must be a string", 
+                400
+            )
+        if task != 'translate':
+            target_language = None
+        
+        # Each batch item is one completion, so chunked tasks keep the single-call budget
+        max_tokens = min(TASKS[task].get('max_tokens', 20000), 20000)
+        loaded = _batch_executor.map(lambda file_path: _load_batch_document(file_path, max_tokens), file_paths)
+        documents = {}
+        skipped = []
+        for file_path, (text_content, error) in zip(file_paths, loaded):
+            if error is not None:
+                skipped.append(error)
+            else:
+                documents[file_path] = text_content
+        
+        if not documents:
+            return create_error_response(
+                "no_documents", 
+                "None of the files could be loaded", 
+                400
             )
         
+        # custom_id is the file path, so results map straight back to the request
+        batch = get_batch_processor().submit(task, documents, target_language)
+        
         response_data = {
-            "file_path": file_path,
-            "file_properties": file_properties,
-            "structured_data": result.get('structured_data'),
-            "was_truncated": was_truncated
+            **batch,
+            "task": task,
+            "submitted": len(documents),
+            "skipped": skipped
         }
         
-        return jsonify(create_success_response(response_data, "Structured data extracted successfully"))
+        return create_success_json(response_data, "Batch job submitted"), 202
         
-    except FileNotFoundError as e:
-        return create_error_response("file_not_found", str(e), 404)
-    except ValueError as e:
-        return create_error_response("processing_error", str(e), 400)
     except Exception as e:
-        logger.error(f"Error in structure-data endpoint: {e}")
+        logger.error("Error in batch endpoint: %s", e)
+        return create_error_response("internal_error", "An unexpected error occurred", 500)
+
+@ai_bp.route('/batch', methods=['GET'])
+def get_batch():
+    """
+    Report the status of a batch job, including per-file results once completed
+    
+    Query parameters:
+        batch_id: Id returned by POST /batch
+    """
+    batch_id = request.args.get('batch_id')
+    if not batch_id:
+        return create_error_response(
+            "missing_batch_id", 
+            "The batch_id query parameter is required", 
+            400
+        )
+    
+    try:
+        batch = get_batch_processor().poll(batch_id)
+        results = batch.get('results')
+        if results is not None:
+            fields = TASKS[batch['task']]['fields']
+            batch['results'] = [
+                {"file_path": file_path, **({"success": True, **fields(result)} if result.get('success') else result)}
+                for file_path, result in results.items()
+            ]
+        
+        return create_success_json(batch, "Batch job status retrieved")
+        
+    except LookupError as e:
+        return create_error_response("batch_not_found", str(e), 404)
+    except Exception as e:
+        logger.error("Error in batch status endpoint: %s", e)
         return create_error_response("internal_error", "An unexpected error occurred", 500)
 
-@ai_bp.route('/detect-topics', methods=['POST'])
-@require_api_key('/detect-topics')
+# /analyze completions run concurrently (greenlets under the gevent worker)
+_SEPARATE_TASKS = {'translate'}
+_analyze_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="analyze")
+
+@ai_bp.route('/analyze', methods=['POST'])
+@cache_response(ttl=4 * 3600, version=_document_version)
 @validate_request_data(['file_path'])
-def detect_document_topics():
+def analyze_document():
     """
-    Detect topics in document content from Azure Blob Storage
+    Run several AI tasks on one document with a single download
+    
+    Tasks share one OpenAI call, except translation, which runs as a
+    concurrent call of its own. Without "tasks", every task is run
+    (translation only when "target_language" is given).
     
     Expected JSON payload:
     {
-        "file_path": "https://storagetest12344.blob.core.windows.net/container/filename.pdf"
+        "file_path": "https://storagetest12344.blob.core.windows.net/container/filename.pdf",
+        "tasks": ["summarize", "sentiment", "extract-keywords"],
+        "target_language": "Hindi"
     }
     """
     try:
         data = request.get_json()
         file_path = data.get('file_path')
+        tasks = data.get('tasks')
+        target_language = data.get('target_language')
+        if tasks is None:
+            tasks = [task for task in MULTI_TASK_SPECS if task != 'translate' or target_language]
         
-        log_request_info('detect-topics', file_path)
+        log_request_info('analyze', file_path, {"tasks": tasks, "target_language": target_language})
         
-        if not validate_file_path(file_path):
+        if not isinstance(file_path, str) or not validate_file_path(file_path):
             return create_error_response(
                 "invalid_file_path", 
                 "Invalid file path format", 
                 400
             )
         
-        # Download and process file
-        file_content = azure_storage.download_blob_content(file_path)
-        file_properties = azure_storage.get_blob_properties(file_path)
-        
-        text_content = file_processor.extract_text_from_content(
-            file_content, 
-            file_properties.get('content_type'), 
-            file_properties.get('name')
-        )
-        
-        text_content, was_truncated = file_processor.validate_text_length(text_content)
-        
-        # Detect topics
-        result = openai_service.detect_topics(text_content)
+        if (not isinstance(tasks, list) or not tasks
+                or any(not isinstance(task, str) or task not in MULTI_TASK_SPECS for task in tasks)):
+            return create_error_response(
+                "invalid_tasks", 
+                f"tasks must be a non-empty list drawn from: {', '.join(MULTI_TASK_SPECS)}", 
+                400
+            )
+        tasks = list(dict.fromkeys(tasks))
         
-        if not result.get('success'):
+        if 'translate' in tasks and not target_language:
             return create_error_response(
-                "topic_detection_failed", 
-                result.get('error'), 
-                500
+                "missing_target_language", 
+                "target_language is required when the translate task is requested", 
+                400
             )
+        if target_language is not None and not isinstance(target_language, str):
+            return create_error_response(
+                "invalid_target_language", 
+                "target_language must be a string", 
+                400
+            )
+        
+        # Fetch and extract document text (cached by blob ETag)
+        text_content, file_properties = get_request_document(file_path)
+        
+        # Translation needs room for the full translated text in the response
+        max_tokens = 12000 if 'translate' in tasks else 20000
+        text_content, was_truncated = file_processor.validate_text_length(text_content, max_tokens)
+        
+        # Completions generate their output serially, so the long translation gets its
+        # own call running alongside one merged call for the remaining tasks
+        groups = [[task] for task in tasks if task in _SEPARATE_TASKS]
+        merged = [task for task in tasks if task not in _SEPARATE_TASKS]
+        if merged:
+            groups.append(merged)
+        openai_service = get_openai_service()
+        futures = [
+            _analyze_executor.submit(openai_service.multi_task, text_content, group, target_language)
+            for group in groups
+        ]
+        outputs = {}
+        for future in futures:
+            result = future.result()
+            if not result.get('success'):
+                return create_error_response(
+                    "analysis_failed", 
+                    result.get('error'), 
+                    500
+                )
+            outputs.update(result.get('results', {}))
+        
+        results = {
+            task: _format_task_result(task, outputs.get(task) or {}, target_language)
+            for task in tasks
+        }
         
         response_data = {
             "file_path": file_path,
             "file_properties": file_properties,
-            "topics": result.get('topics'),
-            "topic_count": result.get('topic_count'),
+            "tasks": tasks,
+            "results": results,
             "was_truncated": was_truncated
         }
         
-        return jsonify(create_success_response(response_data, "Topics detected successfully"))
+        return create_success_json(response_data, "Document analyzed successfully")
         
     except FileNotFoundError as e:
         return create_error_response("file_not_found", str(e), 404)
+    except BlobTooLargeError as e:
+        return create_error_response("file_too_large", str(e), 413)
     except ValueError as e:
         return create_error_response("processing_error", str(e), 400)
     except Exception as e:
-        logger.error(f"Error in detect-topics endpoint: {e}")
+        logger.error("Error in analyze endpoint: %s", e)
         return create_error_response("internal_error", "An unexpected error occurred", 500)
 
-# Health check endpoint
+def _format_task_result(task, output, target_language):
+    """Map one multi-task output onto the response fields of the matching single-task endpoint"""
+    if task == 'summarize':
+        summary = output.get('summary') or ''
+        return {"summary": summary, "summary_length": len(summary)}
+    if task == 'sentiment':
+        return {
+            "sentiment": output.get('sentiment'),
+            "confidence": output.get('confidence'),
+            "explanation": output.get('explanation')
+        }
+    if task == 'extract-keywords':
+        keywords = output.get('keywords', [])
+        return {"keywords": keywords, "keyword_count": len(keywords)}
+    if task == 'translate':
+        translated_text = output.get('translated_text') or ''
+        return {
+            "translated_text": translated_text,
+            "source_language": "auto-detected",
+            "target_language": target_language,
+            "translated_length": len(translated_text)
+        }
+    if task == 'structure-data':
+        return {"structured_data": output}
+    topics = output.get('topics', [])
+    return {"topics": topics, "topic_count": len(topics)}
+
+# Health check endpoint (body is static, so it is serialized once)
+_HEALTH_BODY = orjson.dumps({
+    "status": "healthy",
+    "service": "AI Agent API",
+    "endpoints": [
+        "/summarize",
+        "/summarize/stream",
+        "/sentiment", 
+        "/extract-keywords",
+        "/translate",
+        "/translate/stream",
+        "/structure-data",
+        "/detect-topics",
+        "/analyze",
+        "/summarize-batch",
+        "/batch"
+    ]
+})
+
+def fast_health_check():
+    """
+    before_request hook answering GET /health without dispatching to a view
+    
+    Returns:
+        Response: Pre-serialized health response for health probes, otherwise None
+    """
+    if request.method == 'GET' and request.path == '/health':
+        return Response(_HEALTH_BODY, mimetype='application/json')
+    return None
+
 @ai_bp.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
-        "status": "healthy",
-        "service": "AI Agent API",
-        "endpoints": [
-            "/summarize",
-            "/sentiment", 
-            "/extract-keywords",
-            "/translate",
-            "/structure-data",
-            "/detect-topics"
-        ]
-    })
+    return Response(_HEALTH_BODY, mimetype='application/json')
@@ -1,66 +1,192 @@
 import logging
-from urllib.parse import urlparse  # ✅ REQUIRED for parsing blob URLs
+import tempfile
+import threading
+import re
+from functools import lru_cache
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from cachetools import LRUCache
 from azure.storage.blob import BlobServiceClient, BlobClient  # ⬅️ added BlobClient
-from azure.core.exceptions import ResourceNotFoundError
+from azure.core import MatchConditions
+from azure.core.exceptions import HttpResponseError, ResourceNotFoundError
+from azure.core.pipeline.transport import RequestsTransport
 from config import AZURE_STORAGE_CONNECTION_STRING
 
 logger = logging.getLogger(__name__)
 
+_BLOB_URL_RE = re.compile(r'^https://[^/]+/([^/]+)/(.+)$')
+
+@lru_cache(maxsize=128)
+def _parse_blob_path(blob_url_or_path: str) -> tuple:
+    """
+    Split a blob URL or container/blob_name path into (container, blob)
+
+    Results are memoized since the same paths recur across endpoint calls.
+    """
+    if blob_url_or_path.startswith("https://"):
+        match = _BLOB_URL_RE.match(blob_url_or_path)
+        if not match:
+            raise ValueError("Invalid blob URL format: missing container/blob_name")
+        return match.group(1), match.group(2)
+
+    # fallback for container/blob_name format
+    container_name, sep, blob_name = blob_url_or_path.partition("/")
+    if not sep:
+        raise ValueError("Invalid blob path format. Expected container/blob_name")
+    return container_name, blob_name
+
+def _properties_dict(properties, blob_name):
+    """Flatten SDK BlobProperties into the dict returned to endpoints"""
+    return {
+        'content_type': properties.content_settings.content_type,
+        'size': properties.size,
+        'last_modified': properties.last_modified,
+        'etag': properties.etag,
+        'name': blob_name
+    }
+
+class BlobTooLargeError(Exception):
+    """Raised when a blob exceeds the configured download limit"""
+
+    def __init__(self, blob_name, size, max_bytes, content_type=None):
+        super().__init__(f"Blob {blob_name} is {size} bytes, exceeding the {max_bytes} byte limit")
+        self.blob_name = blob_name
+        self.size = size
+        self.max_bytes = max_bytes
+        self.content_type = content_type
+
 class AzureBlobStorage:
     def __init__(self):
         """Initialize Azure Blob Storage client"""
         try:
+            # One pooled session backs every BlobClient so keep-alive connections are
+            # reused across requests instead of paying a TCP+TLS handshake each time.
+            # The adapter only retries connection failures; HTTP status retries are
+            # left to the storage SDK's own retry policy.
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=64,
+                pool_maxsize=128,
+                max_retries=Retry(total=3, connect=3, read=0, status=0, backoff_factor=0.3)
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            # Explicit timeouts keep a stalled download from pinning a gevent worker
+            # past Gunicorn's request timeout
+            self._transport = RequestsTransport(
+                session=session,
+                connection_timeout=5,
+                read_timeout=60
+            )
             self.blob_service_client = BlobServiceClient.from_connection_string(
-                AZURE_STORAGE_CONNECTION_STRING
+                AZURE_STORAGE_CONNECTION_STRING,
+                transport=self._transport,
+                retry_total=3,
+                max_single_get_size=8 * 1024 * 1024,
+                max_chunk_get_size=4 * 1024 * 1024
             )
+            # BlobClients keyed by (container, blob); they share the service client's pipeline
+            self._blob_clients = LRUCache(maxsize=256)
+            self._blob_clients_lock = threading.Lock()
             logger.info("Azure Blob Storage client initialized successfully")
         except Exception as e:
-            logger.error(f"Failed to initialize Azure Blob Storage client: {e}")
+            logger.error("Failed to initialize Azure Blob Storage client: %s", e)
             raise
 
     def _is_sas_url(self, url: str) -> bool:
         return url.startswith("https://") and "?" in url
 
-    def download_blob_content(self, blob_url_or_path):
+    def _get_blob_client(self, blob_url_or_path):
+        """
+        Resolve a blob URL, SAS URL or container/blob_name path to a BlobClient
+
+        Non-SAS clients are cached per (container, blob) so repeat lookups skip
+        client construction.
+
+        Args:
+            blob_url_or_path (str): Blob URL or path
+
+        Returns:
+            BlobClient: Client for the referenced blob
         """
-        Download content from Azure Blob Storage
+        if self._is_sas_url(blob_url_or_path):
+            # SAS clients carry their own credential but reuse the pooled transport
+            return BlobClient.from_blob_url(
+                blob_url_or_path,
+                transport=self._transport,
+                retry_total=3,
+                max_single_get_size=8 * 1024 * 1024,
+                max_chunk_get_size=4 * 1024 * 1024
+            )
+        key = _parse_blob_path(blob_url_or_path)
+        with self._blob_clients_lock:
+            blob_client = self._blob_clients.get(key)
+            if blob_client is None:
+                blob_client = self.blob_service_client.get_blob_client(container=key[0], blob=key[1])
+                self._blob_clients[key] = blob_client
+        return blob_client
+
+    def download_with_properties(self, blob_url_or_path, max_bytes=None, length=None, if_none_match=None):
+        """
+        Download blob content and its properties with a single GET
+
+        Content type, size, ETag and last-modified come from the download
+        response headers, so no separate properties request is made. Small
+        blobs stay in memory; anything over 8 MiB spills to disk so large
+        PDFs are never held as one contiguous bytes object.
 
         Args:
             blob_url_or_path (str): Blob URL or path in format container/blob_name or full URL
+            max_bytes (int): Reject blobs larger than this before fetching past the first range
+            length (int): Only download the first length bytes
+            if_none_match (str): ETag of a cached copy; the body is skipped if it still matches
 
         Returns:
-            bytes: The blob content
+            tuple: (properties dict, IO[bytes] positioned at the start of the content).
+            When if_none_match is given and the blob is unchanged (HTTP 304)
+            both are None; the caller's cached copy is current.
         """
+        conditions = {}
+        if if_none_match:
+            conditions = {'etag': if_none_match, 'match_condition': MatchConditions.IfModified}
+
         try:
-            if self._is_sas_url(blob_url_or_path):
-                blob_client = BlobClient.from_blob_url(blob_url_or_path)
-            elif blob_url_or_path.startswith("https://"):
-                # Parse URL manually to extract container/blob
-                parsed = urlparse(blob_url_or_path)
-                path_parts = parsed.path.lstrip("/").split("/", 1)
-                if len(path_parts) != 2:
-                    raise ValueError("Invalid blob URL format: missing container/blob_name")
-                container_name, blob_name = path_parts
-                blob_client = self.blob_service_client.get_blob_client(container=container_name, blob=blob_name)
-            else:
-                # fallback for container/blob_name format
-                parts = blob_url_or_path.split("/", 1)
-                if len(parts) != 2:
-                    raise ValueError("Invalid blob path format. Expected container/blob_name")
-                container_name, blob_name = parts
-                blob_client = self.blob_service_client.get_blob_client(container=container_name, blob=blob_name)
-
-            blob_data = blob_client.download_blob()
-            content = blob_data.readall()
-
-            logger.info(f"Successfully downloaded blob: {blob_client.container_name}/{blob_client.blob_name}")
-            return content
+            blob_client = self._get_blob_client(blob_url_or_path)
+
+            downloader = blob_client.download_blob(offset=0 if length else None, length=length, **conditions)
+            # The size is known from the first ranged GET, so an oversized blob
+            # costs at most one max_single_get_size request
+            if max_bytes is not None and downloader.size > max_bytes:
+                raise BlobTooLargeError(
+                    blob_client.blob_name,
+                    downloader.size,
+                    max_bytes,
+                    downloader.properties.content_settings.content_type
+                )
+            properties = _properties_dict(downloader.properties, blob_client.blob_name)
+
+            stream = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+            downloader.readinto(stream)
+            stream.seek(0)
+
+            logger.info("Successfully downloaded blob: %s/%s", blob_client.container_name, blob_client.blob_name)
+            return properties, stream
 
         except ResourceNotFoundError:
-            logger.error(f"Blob not found: {blob_url_or_path}")
+            logger.error("Blob not found: %s", blob_url_or_path)
             raise FileNotFoundError(f"Blob not found: {blob_url_or_path}")
+        except BlobTooLargeError as e:
+            logger.warning("%s", e)
+            raise
+        except HttpResponseError as e:
+            if if_none_match and e.status_code == 304:
+                logger.info("Blob unchanged since cached copy: %s", blob_url_or_path)
+                return None, None
+            logger.error("Error downloading blob %s: %s", blob_url_or_path, e)
+            raise
         except Exception as e:
-            logger.error(f"Error downloading blob {blob_url_or_path}: {e}")
+            logger.error("Error downloading blob %s: %s", blob_url_or_path, e)
             raise
 
     def get_blob_properties(self, blob_url_or_path):
@@ -74,31 +200,15 @@ class AzureBlobStorage:
             dict: Blob properties
         """
         try:
-            if self._is_sas_url(blob_url_or_path):
-                blob_client = BlobClient.from_blob_url(blob_url_or_path)
-            elif blob_url_or_path.startswith("https://"):
-                parsed = urlparse(blob_url_or_path)
-                path_parts = parsed.path.lstrip("/").split("/", 1)
-                if len(path_parts) != 2:
-                    raise ValueError("Invalid blob URL format: missing container/blob_name")
-                container_name, blob_name = path_parts
-                blob_client = self.blob_service_client.get_blob_client(container=container_name, blob=blob_name)
-            else:
-                parts = blob_url_or_path.split("/", 1)
-                if len(parts) != 2:
-                    raise ValueError("Invalid blob path format. Expected container/blob_name")
-                container_name, blob_name = parts
-                blob_client = self.blob_service_client.get_blob_client(container=container_name, blob=blob_name)
+            blob_client = self._get_blob_client(blob_url_or_path)
 
             properties = blob_client.get_blob_properties()
             
-            return {
-                'content_type': properties.content_settings.content_type,
-                'size': properties.size,
-                'last_modified': properties.last_modified,
-                'name': blob_client.blob_name  # ⬅️ consistent with above
-            }
+            return _properties_dict(properties, blob_client.blob_name)
             
+        except ResourceNotFoundError:
+            logger.error("Blob not found: %s", blob_url_or_path)
+            raise FileNotFoundError(f"Blob not found: {blob_url_or_path}")
         except Exception as e:
-            logger.error(f"Error getting blob properties {blob_url_or_path}: {e}")
+            logger.error("Error getting blob properties %s: %s", blob_url_or_path, e)
             raise
@@ -0,0 +1,121 @@
+import logging
+import orjson
+from typing import Dict, Any
+from services.openai_service import TASK_REQUESTS, build_chat_request, parse_task_result
+
+logger = logging.getLogger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+class BatchProcessor:
+    """Runs document tasks through the OpenAI Batch API (half price, results within 24h)"""
+
+    def __init__(self, openai_client):
+        """
+        Initialize the batch processor
+
+        Args:
+            openai_client: OpenAI client used for file uploads and batch jobs
+        """
+        self.client = openai_client
+
+    def submit(self, task: str, documents: Dict[str, str], target_language: str = None) -> Dict[str, Any]:
+        """
+        Upload one request per document and start a batch job
+
+        Request bodies are built exactly as the synchronous endpoints build them.
+
+        Args:
+            task (str): Key into TASK_REQUESTS
+            documents (Dict[str, str]): Document text keyed by custom_id (unique per batch)
+            target_language (str): Target language, for "translate"
+
+        Returns:
+            Dict[str, Any]: batch_id and initial status of the job
+        """
+        lines = [
+            orjson.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": build_chat_request(task, text, target_language)
+            })
+            for custom_id, text in documents.items()
+        ]
+        input_file = self.client.files.create(file=("batch.jsonl", b"\n".join(lines)), purpose="batch")
+
+        # The task travels with the job so poll() knows how to shape its results
+        metadata = {"task": task}
+        if target_language is not None:
+            metadata["target_language"] = target_language
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window="24h",
+            metadata=metadata
+        )
+        logger.info("Submitted %s batch %s with %d requests", task, batch.id, len(lines))
+        return {"batch_id": batch.id, "status": batch.status}
+
+    def poll(self, batch_id: str) -> Dict[str, Any]:
+        """
+        Report the status of a batch job, with per-document results once it completes
+
+        Args:
+            batch_id (str): Batch id returned by submit()
+
+        Returns:
+            Dict[str, Any]: Job status, request counts and, when completed, results keyed by custom_id
+
+        Raises:
+            LookupError: If there is no batch with this id
+        """
+        import openai
+
+        try:
+            batch = self.client.batches.retrieve(batch_id)
+        except openai.NotFoundError:
+            raise LookupError(f"Batch not found: {batch_id}")
+
+        metadata = batch.metadata or {}
+        counts = batch.request_counts
+        info = {
+            "batch_id": batch.id,
+            "status": batch.status,
+            "task": metadata.get("task"),
+            "request_counts": {
+                "total": counts.total,
+                "completed": counts.completed,
+                "failed": counts.failed
+            } if counts else None
+        }
+        if batch.status == "completed" and metadata.get("task") in TASK_REQUESTS:
+            info["results"] = self._collect_results(batch, metadata["task"], metadata.get("target_language"))
+        return info
+
+    def _collect_results(self, batch, task: str, target_language: str = None) -> Dict[str, Dict[str, Any]]:
+        """Download the output and error files of a completed batch and shape each line"""
+        results = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).content.splitlines():
+                if not line.strip():
+                    continue
+                item = orjson.loads(line)
+                results[item["custom_id"]] = self._result_from_line(item, task, target_language)
+        return results
+
+    def _result_from_line(self, item: Dict[str, Any], task: str, target_language: str = None) -> Dict[str, Any]:
+        """Turn one batch output line into a task result (document lengths are not known here)"""
+        response = item.get("response") or {}
+        if item.get("error") or response.get("status_code") != 200:
+            error = item.get("error") or response.get("body", {}).get("error") or {}
+            return {"success": False, "error": f"Batch request failed: {error.get('message', 'unknown error')}"}
+
+        try:
+            content = response["body"]["choices"][0]["message"]["content"]
+            return parse_task_result(task, content, target_language=target_language)
+        except Exception as e:
+            logger.error("Error parsing batch result %s: %s", item.get("custom_id"), e)
+            return {"success": False, "error": f"Batch result could not be parsed: {str(e)}"}
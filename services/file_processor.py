@@ -1,45 +1,183 @@
 import logging
 import io
-import PyPDF2
-from typing import Tuple
+import gzip
+import threading
+import multiprocessing
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import List, Tuple, Union, BinaryIO
+from config import PDF_PARSER_WORKERS, MAX_BLOB_BYTES
 
 logger = logging.getLogger(__name__)
 
+# The PDF libraries, tokenizer, encoding detector and zstd codec are imported
+# where they are used: PDFs are parsed in pool processes, so the server process
+# never loads PDFium or MuPDF at all.
+
+class InvalidPDFError(ValueError):
+    """Raised by a parser process when no PDF backend can read the file"""
+
+# PDFs above this size reach the parser processes through shared memory instead of pickling
+_SHM_THRESHOLD = 4 * 1024 * 1024
+_PDF_TIMEOUT = 60
+
+_TEXT_EXTENSIONS = ('.txt', '.md', '.csv', '.json', '.xml')
+
+# Text blobs may be uploaded pre-compressed; these magic numbers select the codec
+_GZIP_MAGIC = b'\x1f\x8b'
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+# Tokenizer used by the chat model, so truncation matches what OpenAI counts
+_TOKENIZER_MODEL = "gpt-4o"
+# Rough characters-per-token ratio used if the tokenizer cannot be loaded
+_CHARS_PER_TOKEN = 4
+
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """
+    Return this worker's PDF parser pool, creating it on first use
+
+    The pool uses spawned processes so children never inherit the gevent hub
+    or the server's sockets.
+    """
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            _pdf_pool = ProcessPoolExecutor(
+                max_workers=PDF_PARSER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pdf_pool
+
+def _reset_pdf_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next PDF starts a fresh one"""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is pool:
+            _pdf_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+class _PageBuffer:
+    """
+    Accumulates non-empty page texts, newline-separated, in one StringIO
+
+    Avoids holding a list of every page alongside the final joined copy.
+    """
+
+    def __init__(self):
+        self._buffer = io.StringIO()
+        self._has_text = False
+
+    def add(self, page_text: str):
+        if not page_text.strip():  # Only add non-empty pages
+            return
+        if self._has_text:
+            self._buffer.write('\n')
+        self._buffer.write(page_text)
+        self._has_text = True
+
+    def getvalue(self) -> str:
+        return self._buffer.getvalue()
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """
+    Load the tokenizer once per process
+
+    tiktoken fetches its BPE ranks on first use, so this stays off the import
+    path; None is returned (and cached) if they cannot be loaded.
+    """
+    try:
+        import tiktoken
+        return tiktoken.encoding_for_model(_TOKENIZER_MODEL)
+    except Exception as e:
+        logger.warning("Tokenizer unavailable, falling back to character-based truncation: %s", e)
+        return None
+
+def _extract_pdf_worker(payload: Union[bytes, Tuple[str, int]]) -> Tuple[str, int]:
+    """
+    Parser process entry point
+
+    Args:
+        payload: PDF bytes, or (shared memory name, size) for large files
+
+    Returns:
+        Tuple[str, int]: (newline-joined non-empty page texts, total page count)
+    """
+    if isinstance(payload, bytes):
+        return FileProcessor._extract_pdf_pages(payload)
+
+    name, size = payload
+    # Spawned children share the parent's resource tracker, so the parent's
+    # unlink() is the only cleanup the segment needs
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        return FileProcessor._extract_pdf_pages(bytes(shm.buf[:size]))
+    finally:
+        shm.close()
+
 class FileProcessor:
     """Handles processing of different file types to extract text content"""
     
     @staticmethod
-    def extract_text_from_content(content: bytes, content_type: str = None, filename: str = None) -> str:
+    def extract_text_from_content(content: Union[bytes, BinaryIO], content_type: str = None, filename: str = None,
+                                  truncated: bool = False) -> str:
         """
         Extract text content from file bytes based on content type
         
         Args:
-            content (bytes): File content as bytes
+            content (Union[bytes, BinaryIO]): File content as bytes or a seekable binary file object
             content_type (str): MIME type of the file
             filename (str): Original filename for type detection
+            truncated (bool): Whether content is only the head of the file (a ranged download)
             
         Returns:
             str: Extracted text content
         """
         try:
-            # Determine file type
-            file_type = FileProcessor._determine_file_type(content_type, filename, content)
+            # Determine file type (file objects are sniffed without consuming them)
+            if hasattr(content, 'read'):
+                header = content.read(4)
+                content.seek(0)
+            else:
+                header = content
+            file_type = FileProcessor._determine_file_type(content_type, filename, header)
             
             if file_type == 'pdf':
                 return FileProcessor._extract_from_pdf(content)
             elif file_type in ['txt', 'text']:
-                return FileProcessor._extract_from_text(content)
+                return FileProcessor._extract_from_text(content, truncated)
             else:
                 # Try to decode as text first
                 try:
-                    return FileProcessor._extract_from_text(content)
+                    return FileProcessor._extract_from_text(content, truncated)
                 except UnicodeDecodeError:
                     raise ValueError(f"Unsupported file type: {file_type}")
                     
         except Exception as e:
-            logger.error(f"Error extracting text from file: {e}")
+            logger.error("Error extracting text from file: %s", e)
             raise
 
+    @staticmethod
+    def is_text_type(content_type: str = None, filename: str = None) -> bool:
+        """
+        Return True if the content type or filename identify a plain-text file
+        
+        Unlike the sniffing in extract_text_from_content, unknown types are not
+        assumed to be text.
+        """
+        if content_type:
+            content_type = content_type.lower()
+            if 'pdf' in content_type:
+                return False
+            if 'text' in content_type:
+                return True
+        return bool(filename) and filename.lower().endswith(_TEXT_EXTENSIONS)
+
     @staticmethod
     def _determine_file_type(content_type: str, filename: str, content: bytes) -> str:
         """Determine file type from various indicators"""
@@ -56,7 +194,7 @@ class FileProcessor:
             filename_lower = filename.lower()
             if filename_lower.endswith('.pdf'):
                 return 'pdf'
-            elif filename_lower.endswith(('.txt', '.md', '.csv', '.json', '.xml')):
+            elif filename_lower.endswith(_TEXT_EXTENSIONS):
                 return 'text'
         
         # Check file signature (magic bytes)
@@ -67,77 +205,269 @@ class FileProcessor:
         return 'text'
 
     @staticmethod
-    def _extract_from_pdf(content: bytes) -> str:
+    def _extract_from_pdf(content: Union[bytes, BinaryIO]) -> str:
         """Extract text from PDF content"""
         try:
-            pdf_file = io.BytesIO(content)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            
-            # Check if PDF is encrypted
-            if pdf_reader.is_encrypted:
-                raise ValueError("PDF is encrypted and cannot be processed")
+            extracted_text, total_pages = FileProcessor._extract_pdf_in_pool(content)
             
-            text_content = []
-            total_pages = len(pdf_reader.pages)
-            
-            for page_num in range(total_pages):
-                page = pdf_reader.pages[page_num]
-                page_text = page.extract_text()
-                if page_text.strip():  # Only add non-empty pages
-                    text_content.append(page_text)
-            
-            extracted_text = '\n'.join(text_content)
-            
-            if not extracted_text.strip():
+            # Only non-empty pages are written, so any output means there is text
+            if not extracted_text:
                 raise ValueError(
                     f"No extractable text found in PDF ({total_pages} pages). "
                     "This PDF might be image-based, scanned, or have text extraction restrictions. "
                     "Please try with a different PDF that contains selectable text."
                 )
                 
-            logger.info(f"Successfully extracted text from PDF: {len(extracted_text)} characters from {total_pages} pages")
+            logger.info("Successfully extracted text from PDF: %s characters from %s pages", len(extracted_text), total_pages)
             return extracted_text
             
-        except PyPDF2.errors.PdfReadError as e:
-            logger.error(f"PDF read error: {e}")
+        except InvalidPDFError as e:
+            logger.error("PDF read error: %s", e)
             raise ValueError(f"Invalid or corrupted PDF file: {e}")
         except Exception as e:
-            logger.error(f"Error extracting text from PDF: {e}")
+            logger.error("Error extracting text from PDF: %s", e)
             raise ValueError(f"Failed to extract text from PDF: {e}")
 
     @staticmethod
-    def _extract_from_text(content: bytes) -> str:
+    def _extract_pdf_in_pool(content: Union[bytes, BinaryIO]) -> Tuple[str, int]:
+        """
+        Run PDF extraction in the parser process pool
+        
+        Parsing is CPU-bound, so it runs outside the server process where it can
+        use every core and a crashing parser cannot take the worker down.
+        """
+        if hasattr(content, 'read'):
+            size = content.seek(0, io.SEEK_END)
+            content.seek(0)
+        else:
+            size = len(content)
+        
+        pool = _get_pdf_pool()
+        shm = None
+        try:
+            if size > _SHM_THRESHOLD:
+                shm = shared_memory.SharedMemory(create=True, size=size)
+                if hasattr(content, 'read'):
+                    content.readinto(shm.buf[:size])
+                else:
+                    shm.buf[:size] = content
+                payload = (shm.name, size)
+            else:
+                payload = content.read() if hasattr(content, 'read') else bytes(content)
+            
+            return pool.submit(_extract_pdf_worker, payload).result(timeout=_PDF_TIMEOUT)
+        except BrokenProcessPool:
+            _reset_pdf_pool(pool)
+            raise ValueError("PDF parser process crashed while reading the file")
+        except TimeoutError:
+            raise ValueError(f"PDF parsing exceeded {_PDF_TIMEOUT} seconds")
+        finally:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+
+    @staticmethod
+    def _extract_pdf_pages(content: bytes) -> Tuple[str, int]:
+        """Extract page texts with PDFium, falling back to MuPDF for files it cannot open"""
+        import pypdfium2 as pdfium
+        
+        try:
+            return FileProcessor._extract_pages_pdfium(content)
+        except pdfium.PdfiumError as e:
+            # PDFium refuses encrypted/damaged files; MuPDF repairs many damaged
+            # files and reports encryption precisely
+            logger.warning("PDFium could not read PDF, falling back to MuPDF: %s", e)
+        
+        return FileProcessor._extract_pages_pymupdf(content)
+
+    @staticmethod
+    def _extract_pages_pdfium(content: Union[bytes, BinaryIO]) -> Tuple[str, int]:
+        """
+        Extract non-empty page texts with the PDFium C backend
+        
+        PDFium is not thread-safe, so pages are read sequentially; the speedup
+        comes from the native text extraction itself.
+        """
+        import pypdfium2 as pdfium
+        
+        pdf = pdfium.PdfDocument(content)
+        try:
+            buffer = _PageBuffer()
+            total_pages = len(pdf)
+            
+            for page_num in range(total_pages):
+                page = pdf[page_num]
+                textpage = page.get_textpage()
+                buffer.add(textpage.get_text_range().replace('\r\n', '\n'))
+                textpage.close()
+                page.close()
+            
+            return buffer.getvalue(), total_pages
+        finally:
+            pdf.close()
+
+    @staticmethod
+    def _extract_pages_pymupdf(content: Union[bytes, BinaryIO]) -> Tuple[str, int]:
+        """Extract non-empty page texts with MuPDF (fallback for files PDFium cannot open)"""
+        import pymupdf
+        
+        if hasattr(content, 'read'):
+            content = content.read()
+        
+        try:
+            pdf = pymupdf.open(stream=content, filetype='pdf')
+        except pymupdf.FileDataError as e:
+            raise InvalidPDFError(str(e))
+        
+        try:
+            # Check if PDF is encrypted
+            if pdf.needs_pass:
+                raise ValueError("PDF is encrypted and cannot be processed")
+            
+            buffer = _PageBuffer()
+            total_pages = pdf.page_count
+            
+            for page in pdf:
+                buffer.add(page.get_text('text').rstrip('\n'))
+            
+            return buffer.getvalue(), total_pages
+        finally:
+            pdf.close()
+
+    @staticmethod
+    def _decompress(content: bytes, truncated: bool = False) -> Tuple[bytes, bool]:
+        """
+        Decompress gzip or zstd text, passing anything else through
+        
+        Output is capped at MAX_BLOB_BYTES so a small archive cannot expand
+        without bound; the text is cut to a token budget later anyway.
+        A truncated archive is decompressed as far as its data goes.
+        
+        Args:
+            content (bytes): Possibly compressed file content
+            truncated (bool): Whether content is only the head of the file
+            
+        Returns:
+            Tuple[bytes, bool]: (content, whether it may end mid-character)
+        """
+        if content.startswith(_GZIP_MAGIC):
+            reader = gzip.GzipFile(fileobj=io.BytesIO(content))
+        elif content.startswith(_ZSTD_MAGIC):
+            import zstandard
+            reader = zstandard.ZstdDecompressor().stream_reader(content)
+        else:
+            return content, truncated
+        
+        with reader:
+            chunks = []
+            remaining = MAX_BLOB_BYTES
+            while remaining > 0:
+                try:
+                    chunk = reader.read(min(remaining, 1024 * 1024))
+                except EOFError:
+                    # gzip raises once a cut stream has no more output; every
+                    # byte it could decode has already been returned
+                    if not truncated:
+                        raise
+                    break
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                remaining -= len(chunk)
+        return b''.join(chunks), truncated or remaining <= 0
+
+    @staticmethod
+    def _extract_from_text(content: Union[bytes, BinaryIO], truncated: bool = False) -> str:
         """Extract text from text-based content"""
         try:
-            # Try different encodings
-            encodings = ['utf-8', 'utf-16', 'latin-1', 'cp1252']
+            if hasattr(content, 'read'):
+                content = content.read()
+            content, truncated = FileProcessor._decompress(content, truncated)
             
-            for encoding in encodings:
+            # Strict UTF-8 covers the common case without any detection work
+            try:
+                return content.decode('utf-8')
+            except UnicodeDecodeError as e:
+                # A cut can end mid-character; drop only that partial tail
+                if truncated and e.reason == 'unexpected end of data':
+                    return content[:e.start].decode('utf-8')
+            
+            # Otherwise detect the encoding in a single probabilistic pass
+            from charset_normalizer import from_bytes
+            result = from_bytes(content).best()
+            # Without a recognised language the guess is arbitrary (short Latin-1
+            # text reads as UTF-16), so 8-bit text falls back to Windows-1252
+            if (result is None or not result.coherence) and b'\x00' not in content:
                 try:
-                    return content.decode(encoding)
+                    return content.decode('cp1252')
                 except UnicodeDecodeError:
-                    continue
-            
-            raise UnicodeDecodeError("Unable to decode content with any supported encoding")
+                    pass
+            if result is None:
+                raise ValueError("Unable to detect the text encoding")
+            return str(result)
             
         except Exception as e:
-            logger.error(f"Error extracting text from text file: {e}")
+            logger.error("Error extracting text from text file: %s", e)
             raise ValueError(f"Failed to extract text: {e}")
 
     @staticmethod
-    def validate_text_length(text: str, max_length: int = 100000) -> Tuple[str, bool]:
+    def validate_text_length(text: str, max_tokens: int = 20000) -> Tuple[str, bool]:
         """
-        Validate and potentially truncate text length for API limits
+        Validate and potentially truncate text to a model token budget
         
         Args:
             text (str): Text content to validate
-            max_length (int): Maximum allowed length
+            max_tokens (int): Maximum allowed number of tokens
             
         Returns:
             Tuple[str, bool]: (processed_text, was_truncated)
         """
-        if len(text) <= max_length:
+        encoding = _get_encoding()
+        if encoding is None:
+            max_length = max_tokens * _CHARS_PER_TOKEN
+            if len(text) <= max_length:
+                return text, False
+            logger.warning("Text length %s exceeds limit %s, truncating", len(text), max_length)
+            return text[:max_length], True
+        
+        # Every token is at least one character, so short texts need no encoding
+        if len(text) <= max_tokens:
             return text, False
         
-        logger.warning(f"Text length {len(text)} exceeds limit {max_length}, truncating")
-        return text[:max_length], True
+        # Documents are plain data, so skip special-token handling
+        tokens = encoding.encode_ordinary(text)
+        if len(tokens) <= max_tokens:
+            return text, False
+        
+        logger.warning("Text of %s tokens exceeds limit %s, truncating", len(tokens), max_tokens)
+        # A cut can land inside a multi-byte character; drop the partial tail
+        return encoding.decode(tokens[:max_tokens]).rstrip('\ufffd'), True
+
+    @staticmethod
+    def split_text(text: str, chunk_tokens: int) -> List[str]:
+        """
+        Split text into consecutive chunks of at most chunk_tokens tokens
+        
+        Args:
+            text (str): Text content to split
+            chunk_tokens (int): Token budget per chunk
+            
+        Returns:
+            List[str]: Chunks in document order (the text itself if it fits in one)
+        """
+        encoding = _get_encoding()
+        if encoding is None:
+            chunk_length = chunk_tokens * _CHARS_PER_TOKEN
+            return [text[i:i + chunk_length] for i in range(0, len(text), chunk_length)] or [text]
+        
+        if len(text) <= chunk_tokens:
+            return [text]
+        
+        tokens = encoding.encode_ordinary(text)
+        if len(tokens) <= chunk_tokens:
+            return [text]
+        # A character split across a chunk boundary is dropped rather than mangled
+        return [
+            encoding.decode_bytes(tokens[i:i + chunk_tokens]).decode('utf-8', errors='ignore')
+            for i in range(0, len(tokens), chunk_tokens)
+        ]
@@ -1,169 +1,536 @@
-import json
+import time
+import atexit
+import random
 import logging
-from openai import OpenAI
-from config import OPENAI_API_KEY
-from typing import Dict, Any, List
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from config import OPENAI_API_KEY, OPENAI_MAX_REQUESTS_PER_MINUTE, OPENAI_MAX_TOKENS_PER_MINUTE
+from services.rate_limiter import RateLimiter
+from functools import lru_cache
+from typing import Dict, Any, Iterator, List, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Per-task instructions, JSON schema and token budget used by multi_task
+MULTI_TASK_SPECS = {
+    "summarize": (
+        "A concise paragraph that captures the main points and key information of the document.",
+        '"summarize": {"summary": "Concise summary paragraph"}',
+        500
+    ),
+    "sentiment": (
+        "Overall sentiment (positive, negative, or neutral), a confidence score (0.0 to 1.0) and a brief explanation.",
+        '"sentiment": {"sentiment": "positive/negative/neutral", "confidence": 0.85, "explanation": "Brief explanation"}',
+        300
+    ),
+    "extract-keywords": (
+        "The top 15 most important keywords and key phrases (nouns, proper nouns, key concepts, technical terms, names).",
+        '"extract-keywords": {"keywords": ["keyword1", "keyword2"]}',
+        400
+    ),
+    "translate": (
+        "A translation of the full text to {target_language}, maintaining the original meaning, tone, and structure.",
+        '"translate": {"translated_text": "Translated text"}',
+        2000
+    ),
+    "structure-data": (
+        "Structured data: names (people, organizations, locations), dates, amounts (monetary, quantities, numbers), contact info (emails, phones, addresses) and key entities.",
+        '"structure-data": {"names": {"people": [], "organizations": [], "locations": []}, "dates": [], '
+        '"amounts": {"monetary": [], "quantities": [], "numbers": []}, '
+        '"contact_info": {"emails": [], "phones": [], "addresses": []}, "key_entities": []}',
+        800
+    ),
+    "detect-topics": (
+        "Up to 8 primary topics, each with a brief description and a confidence score (0.0 to 1.0).",
+        '"detect-topics": {"topics": [{"name": "Topic Name", "description": "Brief description", "confidence": 0.85}]}',
+        600
+    ),
+}
+
+# Prompt layout for OpenAI prompt caching: a system message shared by every task,
+# then the document, then the task instruction. The cached prefix (system message +
+# document) is byte-identical across endpoints, so analyzing one document several
+# ways only pays full price for its tokens once.
+_SYSTEM_PROMPT = "You are a document analysis assistant. The user sends a document, followed by an instruction describing the analysis to perform on it."
+
+_SUMMARIZE_PROMPT = """
+Please summarize the document above into a concise paragraph that captures the main points and key information.
+
+Provide a clear, informative summary that maintains the essential details while being significantly shorter than the original.
+"""
+
+_SENTIMENT_PROMPT = """
+Analyze the sentiment of the document above and provide:
+1. Overall sentiment (positive, negative, or neutral)
+2. Confidence score (0.0 to 1.0)
+3. Brief explanation of the sentiment analysis
+
+Respond in JSON format with the following structure:
+{
+    "sentiment": "positive/negative/neutral",
+    "confidence": 0.85,
+    "explanation": "Brief explanation of the sentiment analysis"
+}
+"""
+
+_KEYWORDS_PROMPT = """
+Extract the most important keywords and key phrases from the document above.
+Focus on:
+- Important nouns and proper nouns
+- Key concepts and themes
+- Technical terms
+- Names of people, places, organizations
+
+Respond in JSON format with a list of keywords:
+{
+    "keywords": ["keyword1", "keyword2", "keyword3", ...]
+}
+
+Limit to the top 15 most important keywords.
+"""
+
+_TRANSLATE_PROMPT = """
+Translate the document above to {target_language}.
+Maintain the original meaning, tone, and structure as much as possible.
+
+Provide only the translated text without any additional commentary.
+"""
+
+_STRUCTURE_PROMPT = """
+Extract structured data from the document above. Look for and extract:
+- Names (people, organizations, locations)
+- Dates and times
+- Numbers and amounts (monetary, quantities, percentages)
+- Contact information (emails, phone numbers, addresses)
+- Key entities and their relationships
+
+Respond in JSON format with the following structure:
+{
+    "names": {
+        "people": ["person1", "person2"],
+        "organizations": ["org1", "org2"],
+        "locations": ["location1", "location2"]
+    },
+    "dates": ["date1", "date2"],
+    "amounts": {
+        "monetary": ["$100", "$200"],
+        "quantities": ["50 units", "25%"],
+        "numbers": ["100", "200"]
+    },
+    "contact_info": {
+        "emails": ["email1", "email2"],
+        "phones": ["phone1", "phone2"],
+        "addresses": ["address1", "address2"]
+    },
+    "key_entities": ["entity1", "entity2"]
+}
+"""
+
+_TOPICS_PROMPT = """
+Identify the primary topics and themes discussed in the document above.
+Categorize the content and provide:
+- Main topics (up to 8 topics)
+- Brief description for each topic
+- Confidence score for each topic (0.0 to 1.0)
+
+Respond in JSON format:
+{
+    "topics": [
+        {
+            "name": "Topic Name",
+            "description": "Brief description of the topic",
+            "confidence": 0.85
+        }
+    ]
+}
+"""
+
+_SYSTEM_MESSAGE = {"role": "system", "content": _SYSTEM_PROMPT}
+
+# the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
+# Classification-style tasks with short JSON answers run on gpt-4o-mini,
+# which handles them well at a fraction of the cost and latency
+_MODEL = "gpt-4o"
+_LIGHT_MODEL = "gpt-4o-mini"
+
+# Analytical tasks sample at temperature 0 with a fixed seed, so the same
+# document yields the same answer (OpenAI treats the seed as best effort) and
+# cached results match what a fresh call would return
+_SEED = 42
+
+def _messages(text: str, instruction: str) -> List[Dict[str, str]]:
+    """Build the cache-friendly message list: shared system prompt, document, instruction"""
+    return [
+        _SYSTEM_MESSAGE,
+        {"role": "user", "content": text},
+        {"role": "user", "content": instruction}
+    ]
+
+# Model, completion parameters and result shaping per task, shared by the synchronous
+# methods below and by batch jobs (services/batch_processor.py). "result" maps the
+# completion content, the document length (None when unknown) and the target
+# language to the task's success payload.
+TASK_REQUESTS = {
+    "summarize": {
+        "model": _MODEL,
+        "instruction": _SUMMARIZE_PROMPT,
+        "max_tokens": 500,
+        "temperature": 0.3,
+        "json": False,
+        "result": lambda content, text_length, target_language: {
+            "summary": content.strip(),
+            "original_length": text_length,
+            "summary_length": len(content.strip())
+        }
+    },
+    "sentiment": {
+        "model": _LIGHT_MODEL,
+        "instruction": _SENTIMENT_PROMPT,
+        "max_tokens": 300,
+        "temperature": 0,
+        "seed": _SEED,
+        "json": True,
+        "result": lambda content, text_length, target_language: _sentiment_result(orjson.loads(content))
+    },
+    "extract-keywords": {
+        "model": _LIGHT_MODEL,
+        "instruction": _KEYWORDS_PROMPT,
+        "max_tokens": 400,
+        "temperature": 0,
+        "seed": _SEED,
+        "json": True,
+        "result": lambda content, text_length, target_language: _keywords_result(orjson.loads(content))
+    },
+    "translate": {
+        "model": _MODEL,
+        "instruction": _TRANSLATE_PROMPT,
+        "max_tokens": 2000,
+        "temperature": 0.1,
+        "json": False,
+        "result": lambda content, text_length, target_language: {
+            "translated_text": content.strip(),
+            "source_language": "auto-detected",
+            "target_language": target_language,
+            "original_length": text_length,
+            "translated_length": len(content.strip())
+        }
+    },
+    "structure-data": {
+        "model": _MODEL,
+        "instruction": _STRUCTURE_PROMPT,
+        "max_tokens": 800,
+        "temperature": 0,
+        "seed": _SEED,
+        "json": True,
+        "result": lambda content, text_length, target_language: {
+            "structured_data": orjson.loads(content)
+        }
+    },
+    "detect-topics": {
+        "model": _LIGHT_MODEL,
+        "instruction": _TOPICS_PROMPT,
+        "max_tokens": 600,
+        "temperature": 0,
+        "seed": _SEED,
+        "json": True,
+        "result": lambda content, text_length, target_language: _topics_result(orjson.loads(content))
+    },
+}
+
+def _sentiment_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "sentiment": result.get("sentiment"),
+        "confidence": result.get("confidence"),
+        "explanation": result.get("explanation")
+    }
+
+def _keywords_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    keywords = result.get("keywords", [])
+    return {"keywords": keywords, "count": len(keywords)}
+
+def _topics_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    topics = result.get("topics", [])
+    return {"topics": topics, "topic_count": len(topics)}
+
+# Instructions are rebuilt only for new languages / task combinations; repeat
+# requests reuse the same string objects
+@lru_cache(maxsize=128)
+def _format_instruction(instruction: str, target_language: str) -> str:
+    return instruction.format(target_language=target_language)
+
+@lru_cache(maxsize=256)
+def _multi_task_instruction(tasks: Tuple[str, ...], target_language: str = None) -> Tuple[str, int]:
+    """
+    Build the combined instruction and completion token budget for multi_task
+    
+    Args:
+        tasks (Tuple[str, ...]): Task names from MULTI_TASK_SPECS
+        target_language (str): Target language, used by "translate"
+        
+    Returns:
+        Tuple[str, int]: (instruction, max_tokens)
+    """
+    instructions = []
+    schema = []
+    max_tokens = 0
+    for task in tasks:
+        task_instruction, task_schema, task_tokens = MULTI_TASK_SPECS[task]
+        instructions.append(f'- "{task}": {task_instruction.format(target_language=target_language)}')
+        schema.append(task_schema)
+        max_tokens += task_tokens
+    
+    instruction_lines = "\n".join(instructions)
+    schema_lines = ",\n    ".join(schema)
+    instruction = f"""
+Analyze the document above and produce each of these outputs:
+{instruction_lines}
+
+Respond in JSON format with exactly one key per requested output:
+{{
+    {schema_lines}
+}}
+"""
+    return instruction, max_tokens
+
+def build_chat_request(task: str, text: str, target_language: str = None) -> Dict[str, Any]:
+    """
+    Build the chat completion request body for a task
+    
+    Args:
+        task (str): Key into TASK_REQUESTS
+        text (str): Document text content
+        target_language (str): Target language, for "translate"
+        
+    Returns:
+        Dict[str, Any]: Keyword arguments for chat.completions.create
+    """
+    spec = TASK_REQUESTS[task]
+    instruction = spec["instruction"]
+    if target_language is not None:
+        instruction = _format_instruction(instruction, target_language)
+    
+    body = {
+        "model": spec["model"],
+        "messages": _messages(text, instruction),
+        "max_tokens": spec["max_tokens"],
+        "temperature": spec["temperature"]
+    }
+    if "seed" in spec:
+        body["seed"] = spec["seed"]
+    if spec["json"]:
+        body["response_format"] = {"type": "json_object"}
+    return body
+
+def parse_task_result(task: str, content: str, text_length: int = None, target_language: str = None) -> Dict[str, Any]:
+    """
+    Shape a completion's content into the task's success payload
+    
+    Args:
+        task (str): Key into TASK_REQUESTS
+        content (str): Completion message content
+        text_length (int): Length of the document text, if known
+        target_language (str): Target language, for "translate"
+        
+    Returns:
+        Dict[str, Any]: Task result with success flag
+    """
+    return {"success": True, **TASK_REQUESTS[task]["result"](content, text_length, target_language)}
+
+# Completions are retried on 429s, 5xx responses and dropped connections with
+# exponential backoff (about 15s worst case, inside Gunicorn's 120s timeout)
+_MAX_ATTEMPTS = 5
+_MAX_BACKOFF = 20.0
+
+# Rough prompt size for rate limiting; the text has already been cut to a token budget
+_CHARS_PER_TOKEN = 4
+
+def _estimate_tokens(body: Dict[str, Any]) -> int:
+    """Estimate prompt plus completion tokens of a chat request for the rate limiter"""
+    prompt_chars = sum(len(message["content"]) for message in body["messages"])
+    return prompt_chars // _CHARS_PER_TOKEN + body["max_tokens"]
+
 class OpenAIService:
     def __init__(self):
         """Initialize OpenAI client"""
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+        # The SDK is the heaviest import in the service, so it loads with the first client
+        import httpx
+        from openai import OpenAI, DefaultHttpxClient
+        
+        # One explicitly sized keep-alive pool per worker, shared by completions,
+        # embeddings and batch uploads; sockets are gevent-patched, so in-flight
+        # calls from concurrent greenlets each hold one pooled connection.
+        # Bounded timeout so a slow completion cannot outlive Gunicorn's worker timeout
+        self._http_client = DefaultHttpxClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=30.0),
+            timeout=httpx.Timeout(90.0, connect=5.0)
+        )
+        # Retries are handled by _create_completion so they pass through the rate limiter
+        self.client = OpenAI(api_key=OPENAI_API_KEY, http_client=self._http_client, max_retries=0)
+        atexit.register(self._http_client.close)
+        self.rate_limiter = RateLimiter(OPENAI_MAX_REQUESTS_PER_MINUTE, OPENAI_MAX_TOKENS_PER_MINUTE)
+        # Runs the per-chunk summaries of summarize_chunks side by side
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="openai")
         logger.info("OpenAI service initialized successfully")
 
-    def summarize_document(self, text: str) -> Dict[str, Any]:
+    def _create_completion(self, body: Dict[str, Any]):
         """
-        Summarize document content using OpenAI
+        Create a chat completion within the rate limits, retrying transient failures
         
         Args:
-            text (str): Document text content
+            body (Dict[str, Any]): Keyword arguments for chat.completions.create
             
         Returns:
-            Dict[str, Any]: Summary result
+            ChatCompletion: The completion response
         """
+        import openai
+        
+        estimated_tokens = _estimate_tokens(body)
+        for attempt in range(1, _MAX_ATTEMPTS + 1):
+            self.rate_limiter.acquire(estimated_tokens)
+            try:
+                return self.client.chat.completions.create(**body)
+            except openai.APITimeoutError:
+                # A timed-out completion already used most of the request's time budget
+                raise
+            except (openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError) as e:
+                if attempt == _MAX_ATTEMPTS or getattr(e, "code", None) == "insufficient_quota":
+                    raise
+                delay = min(2 ** (attempt - 1) + random.random(), _MAX_BACKOFF)
+                response = getattr(e, "response", None)
+                retry_after = response.headers.get("retry-after") if response is not None else None
+                if retry_after and retry_after.isdigit():
+                    delay = min(max(delay, float(retry_after)), _MAX_BACKOFF)
+                logger.warning("OpenAI request failed (attempt %d/%d), retrying in %.1fs: %s",
+                               attempt, _MAX_ATTEMPTS, delay, e)
+                time.sleep(delay)
+
+    def _run_task(self, task: str, text: str, description: str, failure: str,
+                  target_language: str = None) -> Dict[str, Any]:
+        """Run one TASK_REQUESTS task, reporting failures in the result"""
         try:
-            prompt = f"""
-            Please summarize the following document into a concise paragraph that captures the main points and key information:
-            
-            {text}
-            
-            Provide a clear, informative summary that maintains the essential details while being significantly shorter than the original.
-            """
-            
-            # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
-            # do not change this unless explicitly requested by the user
-            response = self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=500,
-                temperature=0.3
-            )
-            
-            summary = response.choices[0].message.content.strip()
-            
-            return {
-                "success": True,
-                "summary": summary,
-                "original_length": len(text),
-                "summary_length": len(summary)
-            }
+            response = self._create_completion(build_chat_request(task, text, target_language))
+            return parse_task_result(task, response.choices[0].message.content, len(text), target_language)
             
         except Exception as e:
-            logger.error(f"Error in document summarization: {e}")
+            logger.error("Error in %s: %s", description, e)
             return {
                 "success": False,
-                "error": f"Summarization failed: {str(e)}"
+                "error": f"{failure}: {str(e)}"
             }
 
-    def analyze_sentiment(self, text: str) -> Dict[str, Any]:
+    def summarize_document(self, text: str) -> Dict[str, Any]:
         """
-        Analyze sentiment of document content
+        Summarize document content using OpenAI
         
         Args:
             text (str): Document text content
             
         Returns:
-            Dict[str, Any]: Sentiment analysis result
+            Dict[str, Any]: Summary result
         """
-        try:
-            prompt = f"""
-            Analyze the sentiment of the following text and provide:
-            1. Overall sentiment (positive, negative, or neutral)
-            2. Confidence score (0.0 to 1.0)
-            3. Brief explanation of the sentiment analysis
-            
-            Text to analyze:
-            {text}
-            
-            Respond in JSON format with the following structure:
-            {{
-                "sentiment": "positive/negative/neutral",
-                "confidence": 0.85,
-                "explanation": "Brief explanation of the sentiment analysis"
-            }}
-            """
+        return self._run_task("summarize", text, "document summarization", "Summarization failed")
+
+    def summarize_chunks(self, chunks: List[str]) -> Dict[str, Any]:
+        """
+        Summarize a document split into token-sized chunks, map-reduce style
+        
+        Chunks are summarized concurrently, then the partial summaries are
+        summarized together; a single chunk is summarized directly.
+        
+        Args:
+            chunks (List[str]): Document text chunks in order
             
-            # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
-            # do not change this unless explicitly requested by the user
-            response = self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"},
-                max_tokens=300,
-                temperature=0.1
-            )
+        Returns:
+            Dict[str, Any]: Summary result, with original_length of the whole document
+        """
+        if len(chunks) == 1:
+            return self.summarize_document(chunks[0])
+        
+        partials = list(self._executor.map(self.summarize_document, chunks))
+        for partial in partials:
+            if not partial.get("success"):
+                return partial
+        
+        result = self.summarize_document("\n\n".join(partial["summary"] for partial in partials))
+        if result.get("success"):
+            result["original_length"] = sum(len(chunk) for chunk in chunks)
+        return result
+
+    def _stream_task(self, task: str, text: str, target_language: str = None) -> Iterator[str]:
+        """Yield the completion text of a plain-text TASK_REQUESTS task as it is generated"""
+        body = build_chat_request(task, text, target_language)
+        body["stream"] = True
+        # Retries only cover opening the stream; a failure mid-stream propagates
+        stream = self._create_completion(body)
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            stream.close()
+
+    def stream_summary(self, chunks: List[str]) -> Iterator[str]:
+        """
+        Stream the summary of a document split into token-sized chunks
+        
+        As in summarize_chunks, multiple chunks are summarized concurrently
+        first; only the final summary is streamed.
+        
+        Args:
+            chunks (List[str]): Document text chunks in order
             
-            result = json.loads(response.choices[0].message.content)
+        Returns:
+            Iterator[str]: Summary text deltas
+        """
+        if len(chunks) == 1:
+            return self._stream_task("summarize", chunks[0])
+        
+        partials = list(self._executor.map(self.summarize_document, chunks))
+        for partial in partials:
+            if not partial.get("success"):
+                raise RuntimeError(partial.get("error"))
+        return self._stream_task("summarize", "\n\n".join(partial["summary"] for partial in partials))
+
+    def stream_translation(self, text: str, target_language: str) -> Iterator[str]:
+        """
+        Stream the translation of document content
+        
+        Args:
+            text (str): Document text content
+            target_language (str): Target language for translation
             
-            return {
-                "success": True,
-                "sentiment": result.get("sentiment"),
-                "confidence": result.get("confidence"),
-                "explanation": result.get("explanation")
-            }
+        Returns:
+            Iterator[str]: Translated text deltas
+        """
+        return self._stream_task("translate", text, target_language)
+
+    def analyze_sentiment(self, text: str) -> Dict[str, Any]:
+        """
+        Analyze sentiment of document content
+        
+        Sampled deterministically (temperature 0, fixed seed).
+        
+        Args:
+            text (str): Document text content
             
-        except Exception as e:
-            logger.error(f"Error in sentiment analysis: {e}")
-            return {
-                "success": False,
-                "error": f"Sentiment analysis failed: {str(e)}"
-            }
+        Returns:
+            Dict[str, Any]: Sentiment analysis result
+        """
+        return self._run_task("sentiment", text, "sentiment analysis", "Sentiment analysis failed")
 
     def extract_keywords(self, text: str) -> Dict[str, Any]:
         """
         Extract important keywords from document content
         
+        Sampled deterministically (temperature 0, fixed seed).
+        
         Args:
             text (str): Document text content
             
         Returns:
             Dict[str, Any]: Keywords extraction result
         """
-        try:
-            prompt = f"""
-            Extract the most important keywords and key phrases from the following text.
-            Focus on:
-            - Important nouns and proper nouns
-            - Key concepts and themes
-            - Technical terms
-            - Names of people, places, organizations
-            
-            Text to analyze:
-            {text}
-            
-            Respond in JSON format with a list of keywords:
-            {{
-                "keywords": ["keyword1", "keyword2", "keyword3", ...]
-            }}
-            
-            Limit to the top 15 most important keywords.
-            """
-            
-            # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
-            # do not change this unless explicitly requested by the user
-            response = self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"},
-                max_tokens=400,
-                temperature=0.2
-            )
-            
-            result = json.loads(response.choices[0].message.content)
-            
-            return {
-                "success": True,
-                "keywords": result.get("keywords", []),
-                "count": len(result.get("keywords", []))
-            }
-            
-        except Exception as e:
-            logger.error(f"Error in keyword extraction: {e}")
-            return {
-                "success": False,
-                "error": f"Keyword extraction failed: {str(e)}"
-            }
+        return self._run_task("extract-keywords", text, "keyword extraction", "Keyword extraction failed")
 
     def translate_text(self, text: str, target_language: str) -> Dict[str, Any]:
         """
@@ -176,166 +543,78 @@ class OpenAIService:
         Returns:
             Dict[str, Any]: Translation result
         """
-        try:
-            prompt = f"""
-            Translate the following text to {target_language}.
-            Maintain the original meaning, tone, and structure as much as possible.
-            
-            Text to translate:
-            {text}
-            
-            Provide only the translated text without any additional commentary.
-            """
-            
-            # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
-            # do not change this unless explicitly requested by the user
-            response = self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=2000,
-                temperature=0.1
-            )
-            
-            translated_text = response.choices[0].message.content.strip()
-            
-            return {
-                "success": True,
-                "translated_text": translated_text,
-                "source_language": "auto-detected",
-                "target_language": target_language,
-                "original_length": len(text),
-                "translated_length": len(translated_text)
-            }
-            
-        except Exception as e:
-            logger.error(f"Error in translation: {e}")
-            return {
-                "success": False,
-                "error": f"Translation failed: {str(e)}"
-            }
+        return self._run_task(
+            "translate", text, "translation", "Translation failed", target_language=target_language
+        )
 
     def structure_data(self, text: str) -> Dict[str, Any]:
         """
         Extract structured data from document content
         
+        Sampled deterministically (temperature 0, fixed seed).
+        
         Args:
             text (str): Document text content
             
         Returns:
             Dict[str, Any]: Structured data extraction result
         """
-        try:
-            prompt = f"""
-            Extract structured data from the following text. Look for and extract:
-            - Names (people, organizations, locations)
-            - Dates and times
-            - Numbers and amounts (monetary, quantities, percentages)
-            - Contact information (emails, phone numbers, addresses)
-            - Key entities and their relationships
-            
-            Text to analyze:
-            {text}
-            
-            Respond in JSON format with the following structure:
-            {{
-                "names": {{
-                    "people": ["person1", "person2"],
-                    "organizations": ["org1", "org2"],
-                    "locations": ["location1", "location2"]
-                }},
-                "dates": ["date1", "date2"],
-                "amounts": {{
-                    "monetary": ["$100", "$200"],
-                    "quantities": ["50 units", "25%"],
-                    "numbers": ["100", "200"]
-                }},
-                "contact_info": {{
-                    "emails": ["email1", "email2"],
-                    "phones": ["phone1", "phone2"],
-                    "addresses": ["address1", "address2"]
-                }},
-                "key_entities": ["entity1", "entity2"]
-            }}
-            """
-            
-            # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
-            # do not change this unless explicitly requested by the user
-            response = self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"},
-                max_tokens=800,
-                temperature=0.1
-            )
-            
-            result = json.loads(response.choices[0].message.content)
-            
-            return {
-                "success": True,
-                "structured_data": result
-            }
-            
-        except Exception as e:
-            logger.error(f"Error in data structuring: {e}")
-            return {
-                "success": False,
-                "error": f"Data structuring failed: {str(e)}"
-            }
+        return self._run_task("structure-data", text, "data structuring", "Data structuring failed")
 
     def detect_topics(self, text: str) -> Dict[str, Any]:
         """
         Identify primary topics in document content
         
+        Sampled deterministically (temperature 0, fixed seed).
+        
         Args:
             text (str): Document text content
             
         Returns:
             Dict[str, Any]: Topic detection result
         """
-        try:
-            prompt = f"""
-            Identify the primary topics and themes discussed in the following text.
-            Categorize the content and provide:
-            - Main topics (up to 8 topics)
-            - Brief description for each topic
-            - Confidence score for each topic (0.0 to 1.0)
-            
-            Text to analyze:
-            {text}
-            
-            Respond in JSON format:
-            {{
-                "topics": [
-                    {{
-                        "name": "Topic Name",
-                        "description": "Brief description of the topic",
-                        "confidence": 0.85
-                    }}
-                ]
-            }}
-            """
+        return self._run_task("detect-topics", text, "topic detection", "Topic detection failed")
+
+    def multi_task(self, text: str, tasks: List[str], target_language: str = None) -> Dict[str, Any]:
+        """
+        Run several analysis tasks on document content in a single completion
+        
+        Args:
+            text (str): Document text content
+            tasks (List[str]): Task names from MULTI_TASK_SPECS
+            target_language (str): Target language, required when "translate" is requested
             
-            # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
-            # do not change this unless explicitly requested by the user
-            response = self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"},
-                max_tokens=600,
-                temperature=0.2
-            )
+        Returns:
+            Dict[str, Any]: Per-task results keyed by task name
+        """
+        try:
+            instruction, max_tokens = _multi_task_instruction(tuple(tasks), target_language)
+            # The combined request only drops to the light model, or samples
+            # deterministically, when every task allows it
+            light = all(TASK_REQUESTS[task]["model"] == _LIGHT_MODEL for task in tasks)
+            deterministic = all("seed" in TASK_REQUESTS[task] for task in tasks)
+            
+            body = {
+                "model": _LIGHT_MODEL if light else _MODEL,
+                "messages": _messages(text, instruction),
+                "response_format": {"type": "json_object"},
+                "max_tokens": max_tokens,
+                "temperature": 0 if deterministic else 0.2
+            }
+            if deterministic:
+                body["seed"] = _SEED
+            response = self._create_completion(body)
             
-            result = json.loads(response.choices[0].message.content)
+            result = orjson.loads(response.choices[0].message.content)
             
             return {
                 "success": True,
-                "topics": result.get("topics", []),
-                "topic_count": len(result.get("topics", []))
+                "results": {task: result.get(task) for task in tasks}
             }
             
         except Exception as e:
-            logger.error(f"Error in topic detection: {e}")
+            logger.error("Error in multi-task analysis: %s", e)
             return {
                 "success": False,
-                "error": f"Topic detection failed: {str(e)}"
+                "error": f"Multi-task analysis failed: {str(e)}"
             }
@@ -0,0 +1,80 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class RateLimitExceeded(Exception):
+    """Raised when a request would have to wait longer than allowed for rate limit capacity"""
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute token buckets in front of OpenAI calls
+
+    Both buckets refill continuously. A caller reserves one request and its
+    estimated tokens, then sleeps until the reservation is covered, so
+    concurrent callers queue in arrival order. Under the gevent worker
+    threading.Lock and time.sleep are patched and only block the calling
+    greenlet. The limits apply per process.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, max_wait: float = 30.0):
+        """
+        Initialize the rate limiter
+
+        Args:
+            requests_per_minute (int): Request budget per minute (0 disables the bucket)
+            tokens_per_minute (int): Token budget per minute (0 disables the bucket)
+            max_wait (float): Longest a caller may wait before RateLimitExceeded is raised
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_wait = max_wait
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.requests_per_minute > 0 or self.tokens_per_minute > 0
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._updated = now
+        if self.requests_per_minute:
+            self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60.0)
+        if self.tokens_per_minute:
+            self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60.0)
+
+    def acquire(self, tokens: int):
+        """
+        Wait until one request with the given token estimate fits both budgets
+
+        Args:
+            tokens (int): Estimated prompt plus completion tokens
+
+        Raises:
+            RateLimitExceeded: If the wait would exceed max_wait
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._refill(time.monotonic())
+            wait = 0.0
+            if self.requests_per_minute:
+                wait = max(wait, (1 - self._requests) * 60.0 / self.requests_per_minute)
+            if self.tokens_per_minute:
+                # A request larger than the whole bucket is charged a full minute
+                tokens = min(tokens, self.tokens_per_minute)
+                wait = max(wait, (tokens - self._tokens) * 60.0 / self.tokens_per_minute)
+            if wait > self.max_wait:
+                raise RateLimitExceeded(f"OpenAI rate limit budget exhausted, retry in {wait:.0f}s")
+            # Reserve now (the buckets may go negative) so later callers queue behind this one
+            self._requests -= 1
+            self._tokens -= tokens
+
+        if wait > 0:
+            logger.debug("Rate limiter delaying OpenAI request by %.2fs", wait)
+            time.sleep(wait)
@@ -0,0 +1,11 @@
+import logging
+import redis
+from config import REDIS_URL
+
+logger = logging.getLogger(__name__)
+
+# Shared Redis connection for response and document caching (None when REDIS_URL is unset)
+redis_client = redis.Redis.from_url(REDIS_URL, socket_keepalive=True, decode_responses=False) if REDIS_URL else None
+
+if redis_client is None:
+    logger.info("REDIS_URL not configured, Redis caching disabled")
@@ -0,0 +1,162 @@
+import hashlib
+import logging
+import uuid
+from array import array
+import orjson
+import redis
+from redis.commands.search.field import TagField, VectorField
+from redis.commands.search.query import Query
+try:
+    from redis.commands.search.index_definition import IndexDefinition, IndexType
+except ImportError:  # redis-py < 6
+    from redis.commands.search.indexDefinition import IndexDefinition, IndexType
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIM = 1536
+
+# Embedding input is capped well below the model's 8191-token limit
+MAX_EMBEDDING_CHARS = 24000
+
+class SemanticCache:
+    """
+    Caches AI results in two tiers: an exact match on the document's SHA-256,
+    then near-duplicate documents using embedding similarity in Redis Stack
+    """
+
+    def __init__(self, redis_client, openai_client, max_distance: float = 0.15, ttl: int = 4 * 3600,
+                 semantic: bool = True):
+        """
+        Initialize the cache and make sure the vector index exists
+
+        Args:
+            redis_client: Redis connection (None disables the cache)
+            openai_client: OpenAI client used to compute embeddings
+            max_distance (float): Maximum cosine distance considered a hit
+            ttl (int): Time to live for cached entries in seconds
+            semantic (bool): Enable the embedding tier (requires Redis Stack)
+        """
+        self.redis = redis_client
+        self.openai_client = openai_client
+        self.max_distance = max_distance
+        self.ttl = ttl
+        # Keyspace is partitioned by embedding dimension so a model change never mixes vectors
+        self.prefix = f"sem:{EMBEDDING_DIM}:"
+        self.index_name = f"sem_idx_{EMBEDDING_DIM}"
+        # The exact tier only needs plain Redis
+        self.exact_enabled = redis_client is not None
+        self.enabled = semantic and redis_client is not None and self._ensure_index()
+
+    def _ensure_index(self) -> bool:
+        """Create the vector index if needed, disabling the cache when Redis lacks the search module"""
+        try:
+            self.redis.ft(self.index_name).info()
+            return True
+        except redis.ResponseError:
+            pass
+        except redis.RedisError as e:
+            logger.warning("Semantic cache disabled, Redis unavailable: %s", e)
+            return False
+
+        try:
+            self.redis.ft(self.index_name).create_index(
+                [
+                    TagField("task"),
+                    VectorField("vec", "HNSW", {
+                        "TYPE": "FLOAT32",
+                        "DIM": EMBEDDING_DIM,
+                        "DISTANCE_METRIC": "COSINE"
+                    })
+                ],
+                definition=IndexDefinition(prefix=[self.prefix], index_type=IndexType.HASH)
+            )
+            logger.info("Created semantic cache index %s", self.index_name)
+            return True
+        except redis.RedisError as e:
+            logger.warning("Semantic cache disabled, could not create vector index: %s", e)
+            return False
+
+    def _embed(self, text: str) -> bytes:
+        """Compute the document embedding as packed float32 bytes"""
+        response = self.openai_client.embeddings.create(
+            model=EMBEDDING_MODEL,
+            input=text[:MAX_EMBEDDING_CHARS]
+        )
+        return array('f', response.data[0].embedding).tobytes()
+
+    def _exact_key(self, task: str, text: str) -> str:
+        """Key of the exact-match entry for this task and document"""
+        return f"llm:{task}:{hashlib.sha256(text.encode()).hexdigest()}"
+
+    def lookup(self, task: str, text: str, semantic: bool = True) -> Tuple[Optional[Dict[str, Any]], Optional[bytes]]:
+        """
+        Find a cached result for the same or a semantically similar document
+
+        An exact hit skips the embedding request entirely.
+
+        Args:
+            task (str): Task namespace (e.g. "summarize", "translate:Spanish")
+            text (str): Document text content
+            semantic (bool): Also accept near-duplicate documents
+
+        Returns:
+            Tuple[Optional[Dict[str, Any]], Optional[bytes]]: (cached result or None, embedding for store())
+        """
+        if self.exact_enabled:
+            try:
+                cached = self.redis.get(self._exact_key(task, text))
+                if cached is not None:
+                    return orjson.loads(cached), None
+            except redis.RedisError as e:
+                logger.warning("Exact result cache lookup failed: %s", e)
+
+        if not (semantic and self.enabled):
+            return None, None
+
+        try:
+            vector = self._embed(text)
+            query = (
+                Query(f"(@task:{{{_escape_tag(task)}}})=>[KNN 1 @vec $vec AS distance]")
+                .sort_by("distance")
+                .return_fields("distance", "result")
+                .dialect(2)
+            )
+            docs = self.redis.ft(self.index_name).search(query, query_params={"vec": vector}).docs
+        except Exception as e:
+            logger.warning("Semantic cache lookup failed: %s", e)
+            return None, None
+
+        if docs and float(docs[0].distance) <= self.max_distance:
+            return orjson.loads(docs[0].result), vector
+        return None, vector
+
+    def store(self, task: str, text: str, vector: Optional[bytes], result: Dict[str, Any]):
+        """
+        Store a successful result under the document hash and, if computed, its embedding
+
+        Args:
+            task (str): Task namespace used for lookup()
+            text (str): Document text content used for lookup()
+            vector (Optional[bytes]): Embedding returned by lookup()
+            result (Dict[str, Any]): Result to cache
+        """
+        if not self.exact_enabled:
+            return
+
+        payload = orjson.dumps(result)
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.setex(self._exact_key(task, text), self.ttl, payload)
+            if self.enabled and vector is not None:
+                key = f"{self.prefix}{uuid.uuid4().hex}"
+                pipe.hset(key, mapping={"task": task, "vec": vector, "result": payload})
+                pipe.expire(key, self.ttl)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("Failed to store semantic cache entry: %s", e)
+
+def _escape_tag(value: str) -> str:
+    """Escape characters that are special inside a RediSearch TAG query"""
+    return ''.join('\\' + c if not c.isalnum() else c for c in value)
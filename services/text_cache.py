@@ -0,0 +1,196 @@
+import hashlib
+import logging
+import threading
+import orjson
+import redis
+from cachetools import TTLCache
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class TextCache:
+    """
+    Two-tier cache for extracted document text
+
+    An in-process TTL cache serves repeat calls within a worker; Redis (when
+    configured) shares entries across workers and restarts. Entries are keyed
+    by blob path and ETag, or by a digest of the file bytes, so a modified blob
+    is never served stale text and Redis entries can live much longer. Blob
+    entries keep the blob's properties alongside the text, so a blob that is
+    unchanged (HTTP 304) needs no further request to describe it.
+    """
+
+    def __init__(self, redis_client=None, ttl: int = 900, maxsize: int = 128,
+                 redis_ttl: int = 7 * 24 * 3600):
+        """
+        Initialize the text cache
+
+        Args:
+            redis_client: Optional Redis connection for the shared tier
+            ttl (int): Time to live for text cached in process, in seconds
+            maxsize (int): Maximum number of entries kept in process
+            redis_ttl (int): Time to live for text cached in Redis, in seconds
+        """
+        self.redis = redis_client
+        self.ttl = ttl
+        self.redis_ttl = redis_ttl
+        self._local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._by_content = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._known_paths = TTLCache(maxsize=maxsize * 8, ttl=ttl)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(file_path: str, etag: str) -> str:
+        return f"doc:{file_path}:{etag}"
+
+    @staticmethod
+    def _etag_key(file_path: str) -> str:
+        return f"etag:{file_path}"
+
+    @staticmethod
+    def _content_key(digest: bytes) -> str:
+        return f"text:{digest.hex()}"
+
+    @staticmethod
+    def content_digest(content) -> bytes:
+        """
+        Return a short content hash used to deduplicate extraction of identical bytes
+
+        Args:
+            content: File bytes or a seekable binary file object (rewound afterwards)
+
+        Returns:
+            bytes: 16-byte blake2b digest
+        """
+        if not hasattr(content, 'read'):
+            return hashlib.blake2b(content, digest_size=16).digest()
+
+        hasher = hashlib.blake2b(digest_size=16)
+        for chunk in iter(lambda: content.read(1024 * 1024), b''):
+            hasher.update(chunk)
+        content.seek(0)
+        return hasher.digest()
+
+    def last_etag(self, file_path: str) -> Optional[str]:
+        """
+        Return the ETag of the most recently cached version of a blob
+
+        Checked in process first, then in Redis so a cold worker can still send a
+        conditional download for a blob another worker already extracted.
+
+        Args:
+            file_path (str): Blob URL or container/blob_name path
+
+        Returns:
+            Optional[str]: ETag, or None if no version of the blob is cached
+        """
+        with self._lock:
+            etag = self._known_paths.get(file_path)
+        if etag is not None or self.redis is None:
+            return etag
+
+        try:
+            cached = self.redis.get(self._etag_key(file_path))
+        except redis.RedisError as e:
+            logger.warning("Document cache unavailable: %s", e)
+            return None
+        return cached.decode('utf-8') if cached is not None else None
+
+    def get(self, file_path: str, etag: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Look up extracted text and properties for a blob version
+        
+        Args:
+            file_path (str): Blob URL or container/blob_name path
+            etag (str): Blob ETag from its properties
+            
+        Returns:
+            Optional[Tuple[str, Dict[str, Any]]]: Cached (text, properties) or None
+        """
+        key = self._key(file_path, etag)
+        with self._lock:
+            entry = self._local.get(key)
+        if entry is not None:
+            return entry
+        
+        if self.redis is not None:
+            try:
+                cached = self.redis.get(key)
+            except redis.RedisError as e:
+                logger.warning("Document cache unavailable: %s", e)
+                return None
+            if cached is not None:
+                document = orjson.loads(cached)
+                entry = (document["text"], document["properties"])
+                with self._lock:
+                    self._local[key] = entry
+                return entry
+        return None
+
+    def set(self, file_path: str, etag: str, text: str, properties: Dict[str, Any]):
+        """
+        Store extracted text and properties for a blob version
+        
+        Args:
+            file_path (str): Blob URL or container/blob_name path
+            etag (str): Blob ETag from its properties
+            text (str): Extracted text content
+            properties (Dict[str, Any]): Blob properties returned alongside the text
+        """
+        key = self._key(file_path, etag)
+        with self._lock:
+            self._local[key] = (text, properties)
+            self._known_paths[file_path] = etag
+        
+        if self.redis is not None:
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+                pipe.setex(key, self.redis_ttl, orjson.dumps({"text": text, "properties": properties}))
+                pipe.setex(self._etag_key(file_path), self.redis_ttl, etag)
+                pipe.execute()
+            except (redis.RedisError, TypeError) as e:
+                logger.warning("Failed to cache document text for %s: %s", file_path, e)
+
+    def get_by_content(self, digest: bytes) -> Optional[str]:
+        """
+        Look up text previously extracted from identical file bytes
+
+        Args:
+            digest (bytes): Digest from content_digest()
+
+        Returns:
+            Optional[str]: Cached text or None
+        """
+        with self._lock:
+            text = self._by_content.get(digest)
+        if text is not None or self.redis is None:
+            return text
+
+        try:
+            cached = self.redis.get(self._content_key(digest))
+        except redis.RedisError as e:
+            logger.warning("Document cache unavailable: %s", e)
+            return None
+        if cached is None:
+            return None
+        text = cached.decode('utf-8')
+        with self._lock:
+            self._by_content[digest] = text
+        return text
+
+    def set_by_content(self, digest: bytes, text: str):
+        """
+        Remember text extracted from the given file bytes
+
+        Args:
+            digest (bytes): Digest from content_digest()
+            text (str): Extracted text content
+        """
+        with self._lock:
+            self._by_content[digest] = text
+
+        if self.redis is not None:
+            try:
+                self.redis.setex(self._content_key(digest), self.redis_ttl, text.encode('utf-8'))
+            except redis.RedisError as e:
+                logger.warning("Failed to cache document text by content: %s", e)
@@ -4,8 +4,8 @@ Test script for AI Agent API Server
 Demonstrates all API endpoints with proper authentication
 """
 
-import requests
-import json
+import asyncio
+import httpx
 import sys
 
 # API Configuration
@@ -19,7 +19,7 @@ API_KEYS = {
     "detect-topics": "topics-key-123"
 }
 
-def make_request(endpoint, data=None, api_key=None):
+async def make_request(client, endpoint, data=None, api_key=None):
     """Make HTTP request to API endpoint"""
     url = f"{BASE_URL}{endpoint}"
     headers = {"Content-Type": "application/json"}
@@ -29,25 +29,25 @@ def make_request(endpoint, data=None, api_key=None):
     
     try:
         if data:
-            response = requests.post(url, json=data, headers=headers, timeout=10)
+            response = await client.post(url, json=data, headers=headers, timeout=10)
         else:
-            response = requests.get(url, headers=headers, timeout=10)
+            response = await client.get(url, headers=headers, timeout=10)
         
         return response
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         print(f"Connection failed: Server not reachable at {BASE_URL}")
         return None
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         print(f"Request timeout: Server took too long to respond")
         return None
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"Request failed: {e}")
         return None
 
-def test_health():
+async def test_health(client):
     """Test health endpoint"""
     print("\n🔍 Testing Health Endpoint...")
-    response = make_request("/health")
+    response = await make_request(client, "/health")
     
     if response and response.status_code == 200:
         print("✅ Health check passed")
@@ -59,10 +59,10 @@ def test_health():
         print("❌ Health check failed")
         return False
 
-def test_api_info():
+async def test_api_info(client):
     """Test API information endpoint"""
     print("\n📋 Testing API Information...")
-    response = make_request("/")
+    response = await make_request(client, "/")
     
     if response and response.status_code == 200:
         print("✅ API info retrieved successfully")
@@ -75,12 +75,12 @@ def test_api_info():
         print("❌ API info retrieval failed")
         return False
 
-def test_authentication():
+async def test_authentication(client):
     """Test API key authentication"""
     print("\n🔐 Testing Authentication...")
     
     # Test without API key
-    response = make_request("/summarize", {"file_path": "test/file.txt"})
+    response = await make_request(client, "/summarize", {"file_path": "test/file.txt"})
     if response and response.status_code == 401:
         print("✅ Authentication required (no API key)")
     else:
@@ -88,7 +88,7 @@ def test_authentication():
         return False
     
     # Test with invalid API key
-    response = make_request("/summarize", {"file_path": "test/file.txt"}, "invalid-key")
+    response = await make_request(client, "/summarize", {"file_path": "test/file.txt"}, "invalid-key")
     if response and response.status_code == 403:
         print("✅ Authentication failed (invalid API key)")
     else:
@@ -97,13 +97,13 @@ def test_authentication():
     
     return True
 
-def test_ai_endpoint(endpoint_name, endpoint_path, test_data):
+async def test_ai_endpoint(client, endpoint_name, endpoint_path, test_data):
     """Test individual AI endpoint"""
-    print(f"\n🤖 Testing {endpoint_name}...")
-    
     api_key = API_KEYS.get(endpoint_name.lower().replace(" ", "-").replace("_", "-"))
-    response = make_request(endpoint_path, test_data, api_key)
+    response = await make_request(client, endpoint_path, test_data, api_key)
     
+    # Endpoints run concurrently, so report only once the response is in
+    print(f"\n🤖 Testing {endpoint_name}...")
     if response:
         print(f"   Status Code: {response.status_code}")
         
@@ -127,32 +127,36 @@ def test_ai_endpoint(endpoint_name, endpoint_path, test_data):
         print("❌ Request failed")
         return False
 
-def run_comprehensive_tests():
+async def run_comprehensive_tests():
     """Run all API tests"""
     print("🚀 Starting AI Agent API Comprehensive Tests")
     print("=" * 50)
     
     results = []
     
-    # Basic endpoint tests
-    results.append(("Health Check", test_health()))
-    results.append(("API Information", test_api_info()))
-    results.append(("Authentication", test_authentication()))
-    
-    # AI endpoint tests
-    test_file_path = "test-container/sample-document.pdf"
-    
-    ai_tests = [
-        ("Summarize", "/summarize", {"file_path": test_file_path}),
-        ("Sentiment", "/sentiment", {"file_path": test_file_path}),
-        ("Extract Keywords", "/extract-keywords", {"file_path": test_file_path}),
-        ("Translate", "/translate", {"file_path": test_file_path, "target_language": "Spanish"}),
-        ("Structure Data", "/structure-data", {"file_path": test_file_path}),
-        ("Detect Topics", "/detect-topics", {"file_path": test_file_path})
-    ]
-    
-    for name, path, data in ai_tests:
-        results.append((name, test_ai_endpoint(name, path, data)))
+    # One client for the whole run so requests share pooled keep-alive connections
+    async with httpx.AsyncClient() as client:
+        # Basic endpoint tests
+        results.append(("Health Check", await test_health(client)))
+        results.append(("API Information", await test_api_info(client)))
+        results.append(("Authentication", await test_authentication(client)))
+        
+        # AI endpoint tests run concurrently; the suite takes as long as the slowest one
+        test_file_path = "test-container/sample-document.pdf"
+        
+        ai_tests = [
+            ("Summarize", "/summarize", {"file_path": test_file_path}),
+            ("Sentiment", "/sentiment", {"file_path": test_file_path}),
+            ("Extract Keywords", "/extract-keywords", {"file_path": test_file_path}),
+            ("Translate", "/translate", {"file_path": test_file_path, "target_language": "Spanish"}),
+            ("Structure Data", "/structure-data", {"file_path": test_file_path}),
+            ("Detect Topics", "/detect-topics", {"file_path": test_file_path})
+        ]
+        
+        ai_results = await asyncio.gather(*[
+            test_ai_endpoint(client, name, path, data) for name, path, data in ai_tests
+        ])
+        results.extend((name, result) for (name, _, _), result in zip(ai_tests, ai_results))
     
     # Summary
     print("\n" + "=" * 50)
@@ -224,7 +228,7 @@ if __name__ == "__main__":
     
     try:
         # Run comprehensive tests
-        success = run_comprehensive_tests()
+        success = asyncio.run(run_comprehensive_tests())
         
         # Show usage examples
         demonstrate_api_usage()
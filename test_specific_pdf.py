@@ -4,51 +4,109 @@ Test script specifically for the Medium_Articles/Cursone_ai_prompt_use.pdf docum
 This script will diagnose and test the PDF processing capabilities.
 """
 
-import requests
-import json
+import os
+import asyncio
+import multiprocessing
+import httpx
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from azure.storage.blob import BlobServiceClient
 from config import AZURE_STORAGE_CONNECTION_STRING
-import PyPDF2
-import io
+import pypdfium2 as pdfium
 
 # API Configuration
 BASE_URL = "http://localhost:5000"
 PDF_PATH = "storageoneproudct/Medium_Articles/Cursone_ai_prompt_use.pdf"
 PDF_URL = "https://storagetest12344.blob.core.windows.net/storageoneproudct/Medium_Articles/Cursone_ai_prompt_use.pdf"
 
+# Documents with at least this many pages are scanned in a process pool
+PARALLEL_MIN_PAGES = 8
+
+# The document opened by each pool process (see _init_page_worker)
+_worker_pdf = None
+
+@lru_cache(maxsize=1)
+def get_blob_service_client():
+    """Shared storage client, so repeat downloads reuse its keep-alive connections"""
+    return BlobServiceClient.from_connection_string(AZURE_STORAGE_CONNECTION_STRING)
+
+def _page_text(pdf, index):
+    """Extract the text of one page"""
+    textpage = pdf[index].get_textpage()
+    try:
+        return textpage.get_text_range()
+    finally:
+        textpage.close()
+
+def _init_page_worker(content):
+    """Open the PDF once per pool process, so only the page index is sent per task"""
+    global _worker_pdf
+    _worker_pdf = pdfium.PdfDocument(content)
+
+def _extract_page(index):
+    return _page_text(_worker_pdf, index)
+
+def extract_page_texts(content, pdf):
+    """
+    Extract the text of every page
+    
+    PDFium is not thread-safe, so large documents are split across processes,
+    each with its own copy of the document; small ones are read in process.
+    """
+    page_count = len(pdf)
+    if page_count < PARALLEL_MIN_PAGES:
+        return [_page_text(pdf, i) for i in range(page_count)]
+    
+    workers = min(os.cpu_count() or 1, page_count)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_page_worker,
+        initargs=(content,)
+    ) as executor:
+        return list(executor.map(_extract_page, range(page_count), chunksize=max(1, page_count // (workers * 4))))
+
 def diagnose_pdf():
     """Diagnose the PDF file directly"""
     print("Diagnosing PDF file...")
     
     try:
         # Connect to Azure Storage
-        blob_service_client = BlobServiceClient.from_connection_string(AZURE_STORAGE_CONNECTION_STRING)
-        blob_client = blob_service_client.get_blob_client(
+        blob_client = get_blob_service_client().get_blob_client(
             container="storageoneproudct", 
             blob="Medium_Articles/Cursone_ai_prompt_use.pdf"
         )
         
         # Download the PDF
         print("Downloading PDF from Azure Storage...")
-        blob_data = blob_client.download_blob()
+        # Blobs past the first ranged GET are fetched in parallel chunks
+        blob_data = blob_client.download_blob(max_concurrency=8)
         content = blob_data.readall()
         print(f"Downloaded PDF: {len(content)} bytes")
         
         # Analyze PDF structure
-        pdf_file = io.BytesIO(content)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
+        try:
+            pdf = pdfium.PdfDocument(content)
+        except pdfium.PdfiumError as e:
+            # PDFium refuses encrypted (password-protected) and badly damaged files
+            print(f"PDF could not be opened (encrypted or damaged): {e}")
+            return False
         
-        print(f"PDF Pages: {len(pdf_reader.pages)}")
-        print(f"PDF Encrypted: {pdf_reader.is_encrypted}")
+        try:
+            print(f"PDF Pages: {len(pdf)}")
+            page_texts = extract_page_texts(content, pdf)
+        finally:
+            pdf.close()
         
-        # Try to extract text from first few pages
-        for i in range(min(3, len(pdf_reader.pages))):
-            page = pdf_reader.pages[i]
-            page_text = page.extract_text()
+        for i, page_text in enumerate(page_texts[:3]):
             print(f"Page {i+1} text length: {len(page_text)} characters")
-            if page_text.strip():
-                print(f"Sample text from page {i+1}: {page_text[:200]}...")
-                return True
+        
+        text_pages = [i for i, page_text in enumerate(page_texts) if page_text.strip()]
+        print(f"Pages with text: {len(text_pages)}/{len(page_texts)}")
+        if text_pages:
+            first = text_pages[0]
+            print(f"Sample text from page {first+1}: {page_texts[first][:200]}...")
+            return True
         
         print("No extractable text found in any pages")
         return False
@@ -57,7 +115,7 @@ def diagnose_pdf():
         print(f"Error diagnosing PDF: {e}")
         return False
 
-def test_api_endpoint(endpoint, data, timeout=60):
+async def test_api_endpoint(client, endpoint, data, timeout=60):
     """Test a specific API endpoint"""
     api_keys = {
         "/summarize": "summarize-key-123",
@@ -75,9 +133,9 @@ def test_api_endpoint(endpoint, data, timeout=60):
     }
     
     try:
-        print(f"Testing {endpoint} endpoint...")
-        response = requests.post(url, json=data, headers=headers, timeout=timeout)
+        response = await client.post(url, json=data, headers=headers, timeout=timeout)
         
+        print(f"Testing {endpoint} endpoint...")
         print(f"Status Code: {response.status_code}")
         result = response.json()
         
@@ -89,14 +147,16 @@ def test_api_endpoint(endpoint, data, timeout=60):
             print(f"Message: {result.get('message', 'No message')}")
             return None
             
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
+        print(f"Testing {endpoint} endpoint...")
         print("Request timed out")
         return None
     except Exception as e:
+        print(f"Testing {endpoint} endpoint...")
         print(f"Request failed: {e}")
         return None
 
-def main():
+async def main():
     """Main test function"""
     print("Testing PDF Document Processing")
     print("=" * 50)
@@ -123,9 +183,14 @@ def main():
         "/extract-keywords"
     ]
     
-    for endpoint in endpoints_to_test:
+    # The endpoints are independent, so request them all at once over one client
+    async with httpx.AsyncClient() as client:
+        results = await asyncio.gather(*[
+            test_api_endpoint(client, endpoint, test_data, timeout=90) for endpoint in endpoints_to_test
+        ])
+    
+    for endpoint, result in zip(endpoints_to_test, results):
         print("-" * 30)
-        result = test_api_endpoint(endpoint, test_data, timeout=90)
         if result:
             # Display relevant results
             if endpoint == "/summarize" and "data" in result:
@@ -141,4 +206,4 @@ def main():
         print()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
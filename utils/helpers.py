@@ -1,9 +1,20 @@
+import re
 import logging
+from decimal import Decimal
+from functools import lru_cache
 from typing import Dict, Any
-from flask import jsonify
+import orjson
+from flask import Response, jsonify
 
 logger = logging.getLogger(__name__)
 
+# A '/' followed by a final segment containing a '.'
+_URL_LAST_SEGMENT_RE = re.compile(r'/[^/]*\.[^/]*$')
+
+_SAFE_FILENAME_CHARS = b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789.-_"
+# Every byte outside the safe set, for bytes.translate's delete argument
+_UNSAFE_FILENAME_BYTES = bytes(b for b in range(256) if b not in _SAFE_FILENAME_CHARS)
+
 def create_success_response(data: Dict[str, Any], message: str = None) -> Dict[str, Any]:
     """
     Create a standardized success response
@@ -25,6 +36,41 @@ def create_success_response(data: Dict[str, Any], message: str = None) -> Dict[s
     
     return response
 
+# The success envelope around the data is fixed, so its bytes are spliced
+# around the serialized data rather than built and walked as a dict
+_SUCCESS_PREFIX = b'{"status":"success","data":'
+
+def orjson_default(obj):
+    """Serialize types orjson does not handle natively"""
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+@lru_cache(maxsize=64)
+def _success_suffix(message: str) -> bytes:
+    """Closing bytes of the success envelope; messages are per-endpoint constants"""
+    if not message:
+        return b'}'
+    return b',"message":' + orjson.dumps(message) + b'}'
+
+def create_success_json(data: Dict[str, Any], message: str = None) -> Response:
+    """
+    Create a standardized success response, serialized straight to JSON
+    
+    Produces the same body as jsonify(create_success_response(data, message)).
+    
+    Args:
+        data (Dict[str, Any]): Response data
+        message (str): Optional success message
+        
+    Returns:
+        Response: JSON response
+    """
+    body = _SUCCESS_PREFIX + orjson.dumps(data, default=orjson_default, option=orjson.OPT_NON_STR_KEYS)
+    return Response(body + _success_suffix(message), mimetype="application/json")
+
 def create_error_response(error: str, message: str = None, status_code: int = 500) -> tuple:
     """
     Create a standardized error response
@@ -56,6 +102,10 @@ def log_request_info(endpoint: str, file_path: str = None, additional_info: Dict
         file_path (str): File path being processed
         additional_info (Dict): Additional information to log
     """
+    # Called on every request, so skip building the record when INFO is filtered out
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    
     log_data = {
         "endpoint": endpoint,
         "file_path": file_path
@@ -64,7 +114,7 @@ def log_request_info(endpoint: str, file_path: str = None, additional_info: Dict
     if additional_info:
         log_data.update(additional_info)
     
-    logger.info(f"Processing request: {log_data}")
+    logger.info("Processing request: %s", log_data)
 
 def validate_file_path(file_path: str) -> bool:
     """
@@ -81,11 +131,11 @@ def validate_file_path(file_path: str) -> bool:
     
     # Check for basic path format
     if file_path.startswith('http'):
-        # URL format validation
-        return '/' in file_path and '.' in file_path.split('/')[-1]
+        # URL format validation: the last path segment has an extension
+        return _URL_LAST_SEGMENT_RE.search(file_path) is not None
     else:
         # Container/blob format validation
-        return '/' in file_path and len(file_path.split('/')) >= 2
+        return '/' in file_path
     
 def sanitize_filename(filename: str) -> str:
     """
@@ -100,8 +150,8 @@ def sanitize_filename(filename: str) -> str:
     if not filename:
         return "unknown_file"
     
-    # Remove path separators and dangerous characters
-    safe_chars = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789.-_"
-    sanitized = ''.join(c for c in filename if c in safe_chars)
+    # Remove path separators and dangerous characters in one C-level pass; characters
+    # beyond Latin-1 are never safe, so they are dropped by the encode
+    sanitized = filename.encode('latin-1', 'ignore').translate(None, _UNSAFE_FILENAME_BYTES).decode('ascii')
     
     return sanitized if sanitized else "unknown_file"